@@ -3,19 +3,23 @@ Type-Safe ACP API Layer
 FastAPI with Pydantic models for request/response validation
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional
 from datetime import datetime
+from urllib.parse import unquote, urlsplit
 from pydantic import ValidationError
+import asyncio
+import json
 import logging
 
 from acp_models import (
     Product, Order, OrderCreateRequest, ProductFilter,
-    CatalogResponse, OrderResponse, ErrorResponse, OrderStatus, CartItem
+    CatalogResponse, OrderResponse, ErrorResponse, OrderStatus, CartItem,
+    BatchRequest
 )
 from acp_commerce import (
-    list_products, get_product_by_id, create_order, get_order,
+    list_products, get_product_by_id, create_order_async, get_order,
     get_recent_orders, get_categories, search_products,
     get_orders_by_user, get_orders_by_status,
     calculate_user_spending, get_spending_by_category,
@@ -116,11 +120,22 @@ async def get_all_categories():
 
 # ==================== ORDER ENDPOINTS ====================
 
-@app.post("/acp/orders", response_model=OrderResponse)
-async def create_new_order(request: OrderCreateRequest):
+@app.post(
+    "/acp/orders",
+    response_model=OrderResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {"application/json": {"schema": OrderCreateRequest.model_json_schema()}},
+            "required": True,
+        }
+    },
+)
+async def create_new_order(request: Request):
     """Create a new order - Type-safe with validation"""
     try:
-        order = create_order(request)
+        # Validate the raw body directly, skipping the intermediate dict
+        order_request = OrderCreateRequest.model_validate_json(await request.body())
+        order = await create_order_async(order_request)
         
         return OrderResponse(
             success=True,
@@ -129,7 +144,8 @@ async def create_new_order(request: OrderCreateRequest):
         )
     except ValidationError as e:
         logger.error(f"Validation error: {e}")
-        raise HTTPException(status_code=422, detail=e.errors())
+        # Input may be the raw body bytes, which aren't JSON serializable
+        raise HTTPException(status_code=422, detail=e.errors(include_input=False))
     except ValueError as e:
         logger.error(f"Business logic error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -309,9 +325,68 @@ async def delete_user_cart(email: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# ==================== BATCH ENDPOINT ====================
+
+async def _dispatch_get(path: str) -> dict:
+    """Run a GET through this app in-process and capture its status and JSON body"""
+    url = urlsplit(path)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        # ASGI wants the decoded path; raw_path keeps the bytes as sent
+        "path": unquote(url.path),
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": [],
+        "client": None,
+        "server": None,
+    }
+    status = 500
+    chunks = []
+    
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+    
+    try:
+        await app(scope, receive, send)
+    except Exception as e:
+        # The error middleware has already sent its 500 response
+        logger.error(f"Batch sub-request {path} failed: {e}")
+    body = b"".join(chunks)
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = body.decode(errors="replace")
+    return {"status": status, "body": data}
+
+
+@app.post("/acp/batch")
+async def batch(batch_request: BatchRequest):
+    """Run several independent GETs in one round trip; responses keep request order"""
+    responses = await asyncio.gather(*(
+        _dispatch_get(sub_request.path) for sub_request in batch_request.requests
+    ))
+    return {
+        "success": True,
+        "responses": responses
+    }
+
+
 # ==================== HEALTH CHECK ====================
 
-@app.get("/health")
+# HEAD too, so readiness probes can skip the body
+@app.api_route("/health", methods=["GET", "HEAD"])
 async def health_check():
     """Health check endpoint"""
     return {
@@ -3,12 +3,18 @@ Type-Safe ACP Commerce Layer
 Uses Pydantic models for validation and type safety
 """
 
+import asyncio
 import json
+import os
+import threading
 import uuid
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from acp_models import (
     Product, LineItem, Buyer, Order, CartItem,
@@ -20,14 +26,26 @@ CATALOG_PATH = Path(__file__).parent / "catalog.json"
 ORDERS_PATH = Path(__file__).parent / "orders.json"
 CARTS_PATH = Path(__file__).parent / "carts.json"
 
+# Reused validator for whole product lists
+_PRODUCTS_ADAPTER = TypeAdapter(List[Product])
+
+
 # Load and validate catalog
 def load_catalog() -> List[Product]:
     """Load catalog with type validation"""
     with open(CATALOG_PATH) as f:
         data = json.load(f)
     
+    product_rows = data.get("products", [])
+    try:
+        # Fast path: validate the whole catalog in one call
+        return _PRODUCTS_ADAPTER.validate_python(product_rows)
+    except ValidationError:
+        pass
+    
+    # Fall back to per-product validation so bad rows are reported and skipped
     products = []
-    for product_data in data.get("products", []):
+    for product_data in product_rows:
         try:
             product = Product(**product_data)
             products.append(product)
@@ -41,6 +59,25 @@ def load_catalog() -> List[Product]:
 # Load catalog
 PRODUCTS = load_catalog()
 
+
+def _build_indexes(products: List[Product]):
+    """Index catalog positions by lowercased category and by price"""
+    by_category = defaultdict(list)
+    for idx, product in enumerate(products):
+        by_category[product.category.lower()].append(idx)
+    by_price = sorted((product.price, idx) for idx, product in enumerate(products))
+    return dict(by_category), [price for price, _ in by_price], [idx for _, idx in by_price]
+
+
+# Catalog is read-only after load; rebuild these if PRODUCTS is ever reassigned
+_BY_CATEGORY, _PRICES, _PRICE_ORDER = _build_indexes(PRODUCTS)
+
+# Products by ID; the first entry wins if an ID is ever duplicated
+_BY_ID = {product.id: product for product in reversed(PRODUCTS)}
+
+# Lowercased (name, description) per product so searches don't lower() per query
+_SEARCH_TEXT = [(product.name.lower(), product.description.lower()) for product in PRODUCTS]
+
 # Load orders
 def load_orders() -> dict[str, Order]:
     """Load orders with type validation"""
@@ -70,6 +107,9 @@ def load_orders() -> dict[str, Order]:
 
 ORDERS = load_orders()
 
+# Serializes order writes; create_order_async runs create_order in worker threads
+_ORDERS_LOCK = threading.Lock()
+
 
 def save_orders():
     """Save orders to JSON file"""
@@ -81,8 +121,15 @@ def save_orders():
         order_dict['updated_at'] = order.updated_at.isoformat()
         orders_dict[order_id] = order_dict
     
-    with open(ORDERS_PATH, 'w') as f:
-        json.dump(orders_dict, f, indent=2)
+    # Write a temp file and swap it in, so readers never see a partial write
+    tmp_path = ORDERS_PATH.with_name(f"{ORDERS_PATH.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(orders_dict, f, indent=2)
+        os.replace(tmp_path, ORDERS_PATH)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
 
 
 def list_products(filters: Optional[ProductFilter] = None) -> List[Product]:
@@ -98,59 +145,53 @@ def list_products(filters: Optional[ProductFilter] = None) -> List[Product]:
     if not filters:
         return PRODUCTS.copy()
     
-    filtered_products = []
+    # Narrow the candidates with an index, then check the remaining filters
+    if filters.category:
+        candidates = _BY_CATEGORY.get(filters.category.lower(), [])
+    elif filters.max_price is not None or filters.min_price is not None:
+        lo = 0 if filters.min_price is None else bisect_left(_PRICES, filters.min_price)
+        hi = len(_PRICES) if filters.max_price is None else bisect_right(_PRICES, filters.max_price)
+        # Back to catalog order so results match an unindexed scan
+        candidates = sorted(_PRICE_ORDER[lo:hi])
+    else:
+        candidates = range(len(PRODUCTS))
     
-    for product in PRODUCTS:
-        include = True
-        
-        # Filter by category
-        if filters.category:
-            if product.category.lower() != filters.category.lower():
-                include = False
-        
-        # Filter by price range
-        if filters.max_price is not None:
-            if product.price > filters.max_price:
-                include = False
-        
-        if filters.min_price is not None:
-            if product.price < filters.min_price:
-                include = False
-        
-        # Filter by color
-        if filters.color:
-            if not product.color or product.color.lower() != filters.color.lower():
-                include = False
-        
-        # Filter by size
-        if filters.size:
-            if not product.size or product.size.upper() != filters.size.upper():
-                include = False
-        
-        # Filter by stock
-        if filters.in_stock is not None:
-            if filters.in_stock and product.stock <= 0:
-                include = False
-        
-        # Search in name/description
-        if filters.search:
-            search_term = filters.search.lower()
-            if (search_term not in product.name.lower() and 
-                search_term not in product.description.lower()):
-                include = False
-        
-        if include:
-            filtered_products.append(product)
+    if filters.search:
+        search_term = filters.search.lower()
+        candidates = [
+            idx for idx in candidates
+            if search_term in _SEARCH_TEXT[idx][0] or search_term in _SEARCH_TEXT[idx][1]
+        ]
+        # Search is already applied; don't repeat it in matches()
+        filters = filters.model_copy(update={"search": None})
     
-    return filtered_products
+    return [PRODUCTS[idx] for idx in candidates if filters.matches(PRODUCTS[idx])]
 
 
 def get_product_by_id(product_id: str) -> Optional[Product]:
     """Get a single product by ID"""
-    for product in PRODUCTS:
-        if product.id == product_id:
-            return product
-    return None
+    return _BY_ID.get(product_id)
+
+
+# Validated buyers keyed by their details; bounded since callers supply the keys
+@lru_cache(maxsize=256)
+def get_or_create_buyer(name: str, email: str, phone: str = "N/A", address: str = "N/A") -> Buyer:
+    """
+    Return a validated Buyer, reusing the instance for repeated details
+    
+    Raises:
+        ValidationError: For invalid buyer details (never cached)
+    """
+    return Buyer(name=name, email=email, phone=phone, address=address)
+
+
+# Buyer for orders placed without buyer info; validated once, frozen so safe to share
+_GUEST_BUYER = Buyer(
+    name="Guest Customer",
+    email="guest@example.com",
+    phone="N/A",
+    address="N/A"
+)
 
 
 def create_order(request: OrderCreateRequest) -> Order:
@@ -169,12 +210,10 @@ def create_order(request: OrderCreateRequest) -> Order:
     """
     # Validation 1: Cart not empty (handled by Pydantic min_length=1)
     
-    # Validation 2: Check all products exist and build line items
-    line_items = []
-    total_amount = 0.0
+    # Validation 2: Resolve every product up front and check existence and stock
+    products = [get_product_by_id(cart_item.product_id) for cart_item in request.line_items]
     
-    for cart_item in request.line_items:
-        product = get_product_by_id(cart_item.product_id)
+    for cart_item, product in zip(request.line_items, products):
         if not product:
             raise ValueError(f"Product '{cart_item.product_id}' not found")
         
@@ -184,55 +223,50 @@ def create_order(request: OrderCreateRequest) -> Order:
                 f"Insufficient stock for '{product.name}'. "
                 f"Available: {product.stock}, Requested: {cart_item.quantity}"
             )
-        
-        # Create line item
-        line_total = product.price * cart_item.quantity
-        line_item = LineItem(
+    
+    # Build line items in one pass. Inputs come from the validated catalog
+    # and request, so skip re-running the model validators.
+    line_items = [
+        LineItem.model_construct(
             product_id=product.id,
             name=product.name,
             quantity=cart_item.quantity,
             unit_amount=product.price,
-            currency=product.currency,
-            line_total=line_total
+            currency=product.currency
         )
-        
-        line_items.append(line_item)
-        total_amount += line_total
+        for cart_item, product in zip(request.line_items, products)
+    ]
     
-    # Prepare buyer info
-    if request.buyer_info:
-        buyer = request.buyer_info
-    else:
-        # Default guest buyer
-        buyer = Buyer(
-            name="Guest Customer",
-            email="guest@example.com",
-            phone="N/A",
-            address="N/A"
-        )
+    # Prepare buyer info, defaulting to the shared guest buyer
+    buyer = request.buyer_info or _GUEST_BUYER
     
     # Generate order ID
     order_id = f"ORD_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
     
-    # Create order (Pydantic will validate)
-    order = Order(
+    # Create order from already-validated parts
+    order = Order.model_construct(
         id=order_id,
         buyer=buyer,
         line_items=line_items,
-        total_amount=total_amount,
         currency="INR",
-        status=OrderStatus.PENDING,
+        status=OrderStatus.PENDING.value,
         created_at=datetime.now(),
         updated_at=datetime.now()
     )
     
-    # Store order
-    ORDERS[order_id] = order
-    save_orders()
+    # Store order and persist it in a single write
+    with _ORDERS_LOCK:
+        ORDERS[order_id] = order
+        save_orders()
     
     return order
 
 
+async def create_order_async(request: OrderCreateRequest) -> Order:
+    """create_order in a worker thread, so the file write doesn't block the event loop"""
+    return await asyncio.to_thread(create_order, request)
+
+
 def get_order(order_id: str) -> Optional[Order]:
     """Get order by ID"""
     return ORDERS.get(order_id)
@@ -247,11 +281,14 @@ def get_recent_orders(limit: int = 5) -> List[Order]:
 
 def update_order_status(order_id: str, status: OrderStatus) -> bool:
     """Update order status"""
-    if order_id in ORDERS:
-        ORDERS[order_id].status = status
-        ORDERS[order_id].updated_at = datetime.now()
-        save_orders()
-        return True
+    with _ORDERS_LOCK:
+        if order_id in ORDERS:
+            # Orders are frozen, so store an updated copy
+            ORDERS[order_id] = ORDERS[order_id].model_copy(
+                update={"status": OrderStatus(status).value, "updated_at": datetime.now()}
+            )
+            save_orders()
+            return True
     return False
 
 
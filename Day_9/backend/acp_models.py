@@ -3,8 +3,8 @@ Type-Safe ACP (Agentic Commerce Protocol) Models
 Using Pydantic for runtime validation and type safety
 """
 
-from pydantic import BaseModel, Field, EmailStr, validator
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, computed_field, model_validator
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -18,6 +18,10 @@ class OrderStatus(str, Enum):
     CANCELLED = "CANCELLED"
 
 
+# Field type for Order.status; validates faster than the Enum
+OrderStatusLiteral = Literal["PENDING", "CONFIRMED", "SHIPPED", "DELIVERED", "CANCELLED"]
+
+
 class Product(BaseModel):
     """Type-safe product model"""
     id: str = Field(..., description="Unique product identifier")
@@ -31,8 +35,9 @@ class Product(BaseModel):
     stock: int = Field(default=100, ge=0, description="Available stock")
     image_url: Optional[str] = Field(None, description="Product image URL")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "id": "mug-001",
                 "name": "Stoneware Coffee Mug",
@@ -43,6 +48,7 @@ class Product(BaseModel):
                 "stock": 50
             }
         }
+    )
 
 
 class LineItem(BaseModel):
@@ -52,19 +58,30 @@ class LineItem(BaseModel):
     quantity: int = Field(..., gt=0, description="Quantity (must be positive)")
     unit_amount: float = Field(..., gt=0, description="Price per unit")
     currency: str = Field(default="INR", description="Currency code")
-    line_total: float = Field(..., ge=0, description="Total for this line")
+    size: Optional[str] = Field(None, description="Size for clothing items")
     
-    @validator('line_total')
-    def validate_line_total(cls, v, values):
-        """Ensure line_total matches quantity * unit_amount"""
-        if 'quantity' in values and 'unit_amount' in values:
-            expected = values['quantity'] * values['unit_amount']
-            if abs(v - expected) > 0.01:  # Allow small floating point differences
-                raise ValueError(f"line_total {v} doesn't match quantity * unit_amount = {expected}")
-        return v
+    @computed_field(description="Total for this line")
+    @property
+    def line_total(self) -> float:
+        return round(self.quantity * self.unit_amount, 2)
     
-    class Config:
-        json_schema_extra = {
+    @model_validator(mode="wrap")
+    @classmethod
+    def check_supplied_line_total(cls, data, handler):
+        """Accept a supplied line_total (e.g. from orders.json) only if it matches"""
+        supplied = None
+        if isinstance(data, dict) and "line_total" in data:
+            data = dict(data)
+            supplied = data.pop("line_total")
+        item = handler(data)
+        if supplied is not None and abs(supplied - item.line_total) > 0.01:  # Allow small floating point differences
+            raise ValueError(f"line_total {supplied} doesn't match quantity * unit_amount = {item.line_total}")
+        return item
+    
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+        json_schema_extra={
             "example": {
                 "product_id": "mug-001",
                 "name": "Stoneware Coffee Mug",
@@ -74,6 +91,7 @@ class LineItem(BaseModel):
                 "line_total": 1600
             }
         }
+    )
 
 
 class Buyer(BaseModel):
@@ -83,8 +101,9 @@ class Buyer(BaseModel):
     phone: str = Field(default="N/A", description="Phone number")
     address: str = Field(default="N/A", description="Delivery address")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "name": "John Doe",
                 "email": "john@example.com",
@@ -92,6 +111,7 @@ class Buyer(BaseModel):
                 "address": "123 Main St, Mumbai"
             }
         }
+    )
 
 
 class Order(BaseModel):
@@ -99,23 +119,33 @@ class Order(BaseModel):
     id: str = Field(..., description="Unique order identifier")
     buyer: Buyer = Field(..., description="Buyer information")
     line_items: List[LineItem] = Field(..., min_length=1, description="Order items")
-    total_amount: float = Field(..., ge=0, description="Total order amount")
     currency: str = Field(default="INR", description="Currency code")
-    status: OrderStatus = Field(default=OrderStatus.PENDING, description="Order status")
+    status: OrderStatusLiteral = Field(default="PENDING", description="Order status")
     created_at: datetime = Field(default_factory=datetime.now, description="Creation timestamp")
     updated_at: datetime = Field(default_factory=datetime.now, description="Last update timestamp")
     
-    @validator('total_amount')
-    def validate_total_amount(cls, v, values):
-        """Ensure total_amount matches sum of line_items"""
-        if 'line_items' in values:
-            expected = sum(item.line_total for item in values['line_items'])
-            if abs(v - expected) > 0.01:
-                raise ValueError(f"total_amount {v} doesn't match sum of line items = {expected}")
-        return v
+    @computed_field(description="Total order amount")
+    @property
+    def total_amount(self) -> float:
+        return round(sum(item.line_total for item in self.line_items), 2)
+    
+    @model_validator(mode="wrap")
+    @classmethod
+    def check_supplied_total_amount(cls, data, handler):
+        """Accept a supplied total_amount (e.g. from orders.json) only if it matches"""
+        supplied = None
+        if isinstance(data, dict) and "total_amount" in data:
+            data = dict(data)
+            supplied = data.pop("total_amount")
+        order = handler(data)
+        if supplied is not None and abs(supplied - order.total_amount) > 0.01:
+            raise ValueError(f"total_amount {supplied} doesn't match sum of line items = {order.total_amount}")
+        return order
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
+        json_schema_extra={
             "example": {
                 "id": "ORD_20241130_123456_abc123",
                 "buyer": {
@@ -139,6 +169,7 @@ class Order(BaseModel):
                 "status": "PENDING"
             }
         }
+    )
 
 
 class CartItem(BaseModel):
@@ -146,13 +177,14 @@ class CartItem(BaseModel):
     product_id: str = Field(..., description="Product identifier")
     quantity: int = Field(..., gt=0, description="Quantity (must be positive)")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "product_id": "mug-001",
                 "quantity": 2
             }
         }
+    )
 
 
 class OrderCreateRequest(BaseModel):
@@ -160,8 +192,8 @@ class OrderCreateRequest(BaseModel):
     line_items: List[CartItem] = Field(..., min_length=1, description="Items to order")
     buyer_info: Optional[Buyer] = Field(None, description="Buyer information")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "line_items": [
                     {"product_id": "mug-001", "quantity": 2},
@@ -175,26 +207,66 @@ class OrderCreateRequest(BaseModel):
                 }
             }
         }
+    )
 
 
 class ProductFilter(BaseModel):
     """Type-safe product filter model"""
     category: Optional[str] = None
     search: Optional[str] = None
+    name_contains: Optional[str] = None
     max_price: Optional[float] = Field(None, gt=0)
     min_price: Optional[float] = Field(None, ge=0)
     color: Optional[str] = None
     size: Optional[str] = None
     in_stock: Optional[bool] = None
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "category": "mug",
                 "max_price": 1000,
                 "in_stock": True
             }
         }
+    )
+    
+    def matches(self, product: Product) -> bool:
+        """Check whether a product satisfies every filter that is set"""
+        # Filter by category
+        if self.category and product.category.lower() != self.category.lower():
+            return False
+        
+        # Filter by price range
+        if self.max_price is not None and product.price > self.max_price:
+            return False
+        if self.min_price is not None and product.price < self.min_price:
+            return False
+        
+        # Filter by color
+        if self.color and (not product.color or product.color.lower() != self.color.lower()):
+            return False
+        
+        # Filter by size
+        if self.size and (not product.size or product.size.upper() != self.size.upper()):
+            return False
+        
+        # Filter by stock
+        if self.in_stock and product.stock <= 0:
+            return False
+        
+        # Search in name/description
+        if self.search:
+            search_term = self.search.lower()
+            if (search_term not in product.name.lower() and
+                    search_term not in product.description.lower()):
+                return False
+        
+        # Substring of the name only
+        if self.name_contains and self.name_contains.lower() not in product.name.lower():
+            return False
+        
+        return True
 
 
 class CatalogResponse(BaseModel):
@@ -203,8 +275,8 @@ class CatalogResponse(BaseModel):
     count: int = Field(..., ge=0)
     products: List[Product]
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "success": True,
                 "count": 2,
@@ -220,6 +292,7 @@ class CatalogResponse(BaseModel):
                 ]
             }
         }
+    )
 
 
 class OrderResponse(BaseModel):
@@ -228,8 +301,8 @@ class OrderResponse(BaseModel):
     message: str = "Order created successfully"
     order: Order
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "success": True,
                 "message": "Order created successfully",
@@ -240,6 +313,7 @@ class OrderResponse(BaseModel):
                 }
             }
         }
+    )
 
 
 class ErrorResponse(BaseModel):
@@ -248,11 +322,34 @@ class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error message")
     details: Optional[Dict[str, Any]] = Field(None, description="Additional error details")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "success": False,
                 "error": "Product not found",
                 "details": {"product_id": "invalid-123"}
             }
         }
+    )
+
+
+class BatchSubRequest(BaseModel):
+    """One read-only API call inside a batch"""
+    method: Literal["GET"] = "GET"
+    path: str = Field(..., pattern=r"^/acp/", description="API path with optional query string")
+
+
+class BatchRequest(BaseModel):
+    """Several independent GETs sent as one request"""
+    requests: List[BatchSubRequest] = Field(..., min_length=1, max_length=20)
+    
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "requests": [
+                    {"method": "GET", "path": "/acp/catalog?category=mug"},
+                    {"method": "GET", "path": "/acp/categories"}
+                ]
+            }
+        }
+    )
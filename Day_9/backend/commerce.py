@@ -4,8 +4,11 @@ Handles product catalog and order management
 """
 
 import json
+import os
+import threading
 import uuid
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
@@ -19,6 +22,23 @@ with open(CATALOG_PATH) as f:
 
 PRODUCTS = CATALOG_DATA["products"]
 
+
+def _index_by_category(products: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group products by lowercased category, keeping catalog order"""
+    by_category: Dict[str, List[Dict[str, Any]]] = {}
+    for product in products:
+        by_category.setdefault(product.get('category', '').lower(), []).append(product)
+    return by_category
+
+
+# Catalog is read-only after load; rebuild this if PRODUCTS is ever reassigned
+_BY_CATEGORY = _index_by_category(PRODUCTS)
+
+# Filtered product lists keyed by their filters; the catalog is read-only
+# after load, so entries never go stale
+_LIST_CACHE: Dict[tuple, List[Dict[str, Any]]] = {}
+_LIST_CACHE_MAX = 256
+
 # In-memory orders storage (will be persisted to JSON)
 ORDERS = {}
 
@@ -28,10 +48,21 @@ if ORDERS_PATH.exists():
         ORDERS = json.load(f)
 
 
+# Serializes order writes; the agent calls commerce from worker threads
+_ORDERS_LOCK = threading.RLock()
+
+
 def save_orders():
-    """Save orders to JSON file"""
-    with open(ORDERS_PATH, 'w') as f:
-        json.dump(ORDERS, f, indent=2)
+    """Save orders to JSON file, replacing it atomically so readers never see a partial write"""
+    with _ORDERS_LOCK:
+        tmp_path = ORDERS_PATH.with_name(f"{ORDERS_PATH.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(ORDERS, f, indent=2)
+            os.replace(tmp_path, ORDERS_PATH)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
 
 def list_products(filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
@@ -39,16 +70,27 @@ def list_products(filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, An
     Get products from catalog with optional filtering
     
     Args:
-        filters: Optional dict with keys like 'category', 'max_price', 'color', etc.
+        filters: Optional dict with keys like 'category', 'max_price', 'color', 'name_contains', etc.
     
     Returns:
         List of product dictionaries
     """
-    products = PRODUCTS.copy()
-    
     if not filters:
-        return products
+        return PRODUCTS.copy()
+    
+    try:
+        key = tuple(sorted(filters.items()))
+        cached = _LIST_CACHE.get(key)
+    except TypeError:  # Unhashable filter value; just scan
+        key, cached = None, None
+    if cached is not None:
+        return cached.copy()
     
+    # Only scan the requested category when there is one
+    if 'category' in filters:
+        products = _BY_CATEGORY.get(filters['category'].lower(), [])
+    else:
+        products = PRODUCTS
     filtered_products = []
     
     for product in products:
@@ -81,14 +123,24 @@ def list_products(filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, An
                 search_term not in product.get('description', '').lower()):
                 include = False
         
+        # Substring of the name only
+        if 'name_contains' in filters:
+            if filters['name_contains'].lower() not in product.get('name', '').lower():
+                include = False
+        
         if include:
             filtered_products.append(product)
     
-    return filtered_products
+    if key is not None:
+        if len(_LIST_CACHE) >= _LIST_CACHE_MAX:
+            _LIST_CACHE.clear()
+        _LIST_CACHE[key] = filtered_products
+    return filtered_products.copy()
 
 
+@lru_cache(maxsize=1024)
 def get_product_by_id(product_id: str) -> Optional[Dict[str, Any]]:
-    """Get a single product by ID"""
+    """Get a single product by ID (cached, the catalog is loaded once)"""
     for product in PRODUCTS:
         if product['id'] == product_id:
             return product
@@ -139,7 +191,8 @@ def create_order(line_items: List[Dict[str, Any]], buyer_info: Optional[Dict[str
             raise ValueError(f"Item {i+1}: product '{product_id}' not found")
     
     # All validation passed, create order
-    order_id = f"ORD_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+    now = datetime.now()
+    order_id = f"ORD_{now.strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
     
     # Process line items
     processed_items = []
@@ -184,13 +237,14 @@ def create_order(line_items: List[Dict[str, Any]], buyer_info: Optional[Dict[str
         "total_amount": total_amount,
         "currency": "INR",
         "status": "PENDING",
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat()
+        "created_at": now.isoformat(),
+        "updated_at": now.isoformat()
     }
     
     # Store order
-    ORDERS[order_id] = order
-    save_orders()
+    with _ORDERS_LOCK:
+        ORDERS[order_id] = order
+        save_orders()
     
     return order
 
@@ -210,21 +264,27 @@ def get_recent_orders(limit: int = 5) -> List[Dict[str, Any]]:
 
 def update_order_status(order_id: str, status: str) -> bool:
     """Update order status"""
-    if order_id in ORDERS:
-        ORDERS[order_id]['status'] = status
-        ORDERS[order_id]['updated_at'] = datetime.now().isoformat()
-        save_orders()
-        return True
+    with _ORDERS_LOCK:
+        if order_id in ORDERS:
+            ORDERS[order_id]['status'] = status
+            ORDERS[order_id]['updated_at'] = datetime.now().isoformat()
+            save_orders()
+            return True
     return False
 
 
-def get_categories() -> List[str]:
-    """Get all unique product categories"""
+@lru_cache(maxsize=1)
+def _category_names() -> tuple:
     categories = set()
     for product in PRODUCTS:
         if 'category' in product:
             categories.add(product['category'])
-    return sorted(list(categories))
+    return tuple(sorted(categories))
+
+
+def get_categories() -> List[str]:
+    """Get all unique product categories"""
+    return list(_category_names())
 
 
 def search_products(query: str) -> List[Dict[str, Any]]:
@@ -247,12 +307,11 @@ def get_orders_by_date_range(start_date: str, end_date: str) -> List[Dict[str, A
     """Get orders within a date range (format: YYYY-MM-DD)"""
     filtered_orders = []
     try:
-        from datetime import datetime as dt
-        start = dt.strptime(start_date, '%Y-%m-%d')
-        end = dt.strptime(end_date, '%Y-%m-%d')
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
         
         for order in ORDERS.values():
-            order_date = dt.fromisoformat(order['created_at'].split('T')[0])
+            order_date = datetime.fromisoformat(order['created_at'].split('T')[0])
             if start <= order_date <= end:
                 filtered_orders.append(order)
         
@@ -301,11 +360,12 @@ def update_order_status(order_id: str, new_status: str) -> bool:
     if new_status.upper() not in valid_statuses:
         return False
     
-    if order_id in ORDERS:
-        ORDERS[order_id]['status'] = new_status.upper()
-        ORDERS[order_id]['updated_at'] = datetime.now().isoformat()
-        save_orders()
-        return True
+    with _ORDERS_LOCK:
+        if order_id in ORDERS:
+            ORDERS[order_id]['status'] = new_status.upper()
+            ORDERS[order_id]['updated_at'] = datetime.now().isoformat()
+            save_orders()
+            return True
     return False
 
 
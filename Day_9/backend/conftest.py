@@ -0,0 +1,11 @@
+def pytest_addoption(parser):
+    parser.addoption(
+        "--no-batch",
+        action="store_true",
+        help="test_integration: hit catalog endpoints one by one instead of via /acp/batch",
+    )
+    parser.addoption(
+        "--local",
+        action="store_true",
+        help="test_integration: answer requests with canned JSON instead of a live backend",
+    )
@@ -3,134 +3,264 @@ Email Service for Order Confirmations
 Sends automatic email notifications when orders are placed
 """
 
+import asyncio
 import smtplib
 import os
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import re
+import atexit
+import threading
+import time
+import queue
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.message import EmailMessage
 from datetime import datetime
+from typing import List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def send_order_confirmation_email(order: dict, user_email: str, user_name: str) -> bool:
-    """
-    Send order confirmation email to customer
-    
-    Args:
-        order: Order dictionary with id, line_items, total_amount, etc.
-        user_email: Customer email address
-        user_name: Customer name
-    
-    Returns:
-        bool: True if email sent successfully, False otherwise
-    """
-    # Get email configuration from environment
-    smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    sender_email = os.getenv("SENDER_EMAIL", "")
-    sender_password = os.getenv("SENDER_PASSWORD", "")
-    sender_name = os.getenv("SENDER_NAME", "E-Commerce Store")
+@dataclass(frozen=True)
+class _SmtpConfig:
+    """SMTP settings snapshot taken from the environment"""
+    server: str
+    port: int
+    sender_email: str
+    sender_password: str
+    sender_name: str
+
+
+def _load_config() -> _SmtpConfig:
+    return _SmtpConfig(
+        server=os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+        port=int(os.getenv("SMTP_PORT", "587")),
+        sender_email=os.getenv("SENDER_EMAIL", ""),
+        sender_password=os.getenv("SENDER_PASSWORD", ""),
+        sender_name=os.getenv("SENDER_NAME", "E-Commerce Store"),
+    )
+
+
+_CFG = _load_config()
+_EMAIL_ENABLED = bool(_CFG.sender_email and _CFG.sender_password)
+
+
+def reload_config() -> None:
+    """Re-read SMTP settings from the environment (e.g. after load_dotenv)"""
+    global _CFG, _EMAIL_ENABLED
+    _CFG = _load_config()
+    _EMAIL_ENABLED = bool(_CFG.sender_email and _CFG.sender_password)
+
+
+class SmtpPool:
+    """Keeps one authenticated SMTP connection alive between sends"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._server = None
+        self._settings = None
+
+    def _connect(self, settings):
+        smtp_server, smtp_port, sender_email, sender_password = settings
+        server = smtplib.SMTP(smtp_server, smtp_port, timeout=30)
+        try:
+            server.starttls()
+            server.login(sender_email, sender_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _is_alive(self, server) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
+
+    @contextmanager
+    def get(self, smtp_server: str, smtp_port: int, sender_email: str, sender_password: str):
+        """
+        Yield a ready-to-use SMTP connection, reconnecting only when needed
+
+        The connection is held under a lock for the duration of the block so
+        only one thread talks to the server at a time.
+        """
+        settings = (smtp_server, smtp_port, sender_email, sender_password)
+        with self._lock:
+            if self._server is not None and (
+                self._settings != settings or not self._is_alive(self._server)
+            ):
+                self._discard()
+            if self._server is None:
+                self._server = self._connect(settings)
+                self._settings = settings
+            try:
+                yield self._server
+            except smtplib.SMTPServerDisconnected:
+                self._discard()
+                raise
+
+    def _discard(self):
+        try:
+            self._server.close()
+        except Exception:
+            pass
+        self._server = None
+        self._settings = None
+
+    def close(self):
+        """Send QUIT and drop the cached connection"""
+        with self._lock:
+            if self._server is None:
+                return
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._discard()
+
+
+_smtp_pool = SmtpPool()
+atexit.register(_smtp_pool.close)
+
+# Static stylesheet for the confirmation email
+_EMAIL_CSS = """
+body {
+    font-family: Arial, sans-serif;
+    line-height: 1.6;
+    color: #333;
+    max-width: 600px;
+    margin: 0 auto;
+    padding: 20px;
+}
+.header {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    padding: 30px;
+    text-align: center;
+    border-radius: 10px 10px 0 0;
+}
+.header h1 {
+    margin: 0;
+    font-size: 28px;
+}
+.content {
+    background: #f9f9f9;
+    padding: 30px;
+    border-radius: 0 0 10px 10px;
+}
+.order-info {
+    background: white;
+    padding: 20px;
+    border-radius: 8px;
+    margin: 20px 0;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+}
+.order-info h2 {
+    color: #667eea;
+    margin-top: 0;
+}
+.order-details {
+    margin: 15px 0;
+}
+.order-details p {
+    margin: 8px 0;
+}
+.items-table {
+    width: 100%;
+    border-collapse: collapse;
+    margin: 20px 0;
+    background: white;
+}
+.items-table th {
+    background: #667eea;
+    color: white;
+    padding: 12px;
+    text-align: left;
+}
+.items-table td {
+    padding: 12px;
+    border-bottom: 1px solid #ddd;
+}
+.items-table tr:last-child td {
+    border-bottom: none;
+}
+.total-row {
+    background: #f0f0f0;
+    font-weight: bold;
+    font-size: 18px;
+}
+.footer {
+    text-align: center;
+    margin-top: 30px;
+    padding-top: 20px;
+    border-top: 2px solid #ddd;
+    color: #666;
+}
+.status-badge {
+    display: inline-block;
+    padding: 5px 15px;
+    background: #fbbf24;
+    color: #78350f;
+    border-radius: 20px;
+    font-weight: bold;
+    font-size: 14px;
+}
+"""
+
+
+def _minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a stylesheet"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};:,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+# Minified once at import instead of sending the indented source every time
+_MINIFIED_CSS = _minify_css(_EMAIL_CSS)
+
+# Bound once so each price cell is a plain call rather than a format-spec parse
+_CURRENCY_FMT = '{:.2f}'.format
+
+# Each worker thread reuses one message and only swaps the per-order headers/body
+_thread_local = threading.local()
+
+
+def _message_template(cfg: _SmtpConfig) -> EmailMessage:
+    """Return this thread's reusable message, rebuilt if the sender changed"""
+    sender = f"{cfg.sender_name} <{cfg.sender_email}>"
+    msg = getattr(_thread_local, "message", None)
+    if msg is None or msg['From'] != sender:
+        msg = EmailMessage()
+        msg['From'] = sender
+        msg['To'] = ""
+        msg['Subject'] = ""
+        _thread_local.message = msg
+    return msg
+
+
+def _build_message(order: dict, user_email: str, user_name: str, cfg: _SmtpConfig) -> EmailMessage:
+    """Fill this thread's message template for one order"""
+    # Only parse created_at when the caller hands us the serialized form
+    created_at = order['created_at']
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
     
-    if not sender_email or not sender_password:
-        logger.warning("Email configuration missing. Skipping email send.")
-        return False
+    # Create email message
+    msg = _message_template(cfg)
+    msg.replace_header('To', user_email)
+    msg.replace_header('Subject', f"Order Confirmation - {order['id']}")
     
-    try:
-        # Create email message
-        msg = MIMEMultipart('alternative')
-        msg['From'] = f"{sender_name} <{sender_email}>"
-        msg['To'] = user_email
-        msg['Subject'] = f"Order Confirmation - {order['id']}"
-        
-        # Create HTML email body
-        html_body = f"""
+    # Create HTML email body
+    html_body = f"""
 <!DOCTYPE html>
 <html>
 <head>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 600px;
-            margin: 0 auto;
-            padding: 20px;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 30px;
-            text-align: center;
-            border-radius: 10px 10px 0 0;
-        }}
-        .header h1 {{
-            margin: 0;
-            font-size: 28px;
-        }}
-        .content {{
-            background: #f9f9f9;
-            padding: 30px;
-            border-radius: 0 0 10px 10px;
-        }}
-        .order-info {{
-            background: white;
-            padding: 20px;
-            border-radius: 8px;
-            margin: 20px 0;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .order-info h2 {{
-            color: #667eea;
-            margin-top: 0;
-        }}
-        .order-details {{
-            margin: 15px 0;
-        }}
-        .order-details p {{
-            margin: 8px 0;
-        }}
-        .items-table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-            background: white;
-        }}
-        .items-table th {{
-            background: #667eea;
-            color: white;
-            padding: 12px;
-            text-align: left;
-        }}
-        .items-table td {{
-            padding: 12px;
-            border-bottom: 1px solid #ddd;
-        }}
-        .items-table tr:last-child td {{
-            border-bottom: none;
-        }}
-        .total-row {{
-            background: #f0f0f0;
-            font-weight: bold;
-            font-size: 18px;
-        }}
-        .footer {{
-            text-align: center;
-            margin-top: 30px;
-            padding-top: 20px;
-            border-top: 2px solid #ddd;
-            color: #666;
-        }}
-        .status-badge {{
-            display: inline-block;
-            padding: 5px 15px;
-            background: #fbbf24;
-            color: #78350f;
-            border-radius: 20px;
-            font-weight: bold;
-            font-size: 14px;
-        }}
-    </style>
+    <style>{_MINIFIED_CSS}</style>
 </head>
 <body>
     <div class="header">
@@ -143,7 +273,7 @@ def send_order_confirmation_email(order: dict, user_email: str, user_name: str)
             <h2>Order Details</h2>
             <div class="order-details">
                 <p><strong>Order ID:</strong> {order['id']}</p>
-                <p><strong>Order Date:</strong> {datetime.fromisoformat(order['created_at']).strftime('%B %d, %Y at %I:%M %p')}</p>
+                <p><strong>Order Date:</strong> {created_at.strftime('%B %d, %Y at %I:%M %p')}</p>
                 <p><strong>Status:</strong> <span class="status-badge">{order['status']}</span></p>
             </div>
         </div>
@@ -160,28 +290,28 @@ def send_order_confirmation_email(order: dict, user_email: str, user_name: str)
             </thead>
             <tbody>
 """
+    
+    # Add line items
+    for item in order['line_items']:
+        item_name = item['name']
+        # Add size if available
+        if 'size' in item and item['size']:
+            item_name += f" (Size: {item['size']})"
         
-        # Add line items
-        for item in order['line_items']:
-            item_name = item['name']
-            # Add size if available
-            if 'size' in item and item['size']:
-                item_name += f" (Size: {item['size']})"
-            
-            html_body += f"""
+        html_body += f"""
                 <tr>
                     <td>{item_name}</td>
                     <td>{item['quantity']}</td>
-                    <td>₹{item['unit_amount']:.2f}</td>
-                    <td>₹{item['line_total']:.2f}</td>
+                    <td>₹{_CURRENCY_FMT(item['unit_amount'])}</td>
+                    <td>₹{_CURRENCY_FMT(item['line_total'])}</td>
                 </tr>
 """
-        
-        # Add total
-        html_body += f"""
+    
+    # Add total
+    html_body += f"""
                 <tr class="total-row">
                     <td colspan="3">Total Amount</td>
-                    <td>₹{order['total_amount']:.2f}</td>
+                    <td>₹{_CURRENCY_FMT(order['total_amount'])}</td>
                 </tr>
             </tbody>
         </table>
@@ -197,7 +327,7 @@ def send_order_confirmation_email(order: dict, user_email: str, user_name: str)
         </div>
         
         <div class="footer">
-            <p>Thank you for shopping with {sender_name}!</p>
+            <p>Thank you for shopping with {cfg.sender_name}!</p>
             <p>If you have any questions, please reply to this email.</p>
             <p style="font-size: 12px; color: #999;">
                 This is an automated email. Please do not reply directly to this message.
@@ -207,17 +337,42 @@ def send_order_confirmation_email(order: dict, user_email: str, user_name: str)
 </body>
 </html>
 """
-        
-        # Attach HTML body
-        html_part = MIMEText(html_body, 'html')
-        msg.attach(html_part)
+    
+    # Attach HTML body
+    msg.set_content(html_body, subtype='html', charset='utf-8')
+    return msg
+
+
+def send_order_confirmation_email(order: dict, user_email: str, user_name: str) -> bool:
+    """
+    Send order confirmation email to customer
+    
+    Args:
+        order: Order dictionary with id, line_items, total_amount, etc.
+            created_at may be a datetime or an ISO-format string.
+        user_email: Customer email address
+        user_name: Customer name
+    
+    Returns:
+        bool: True if email sent successfully, False otherwise
+    """
+    if not _EMAIL_ENABLED:
+        logger.warning("Email configuration missing. Skipping email send.")
+        return False
+    cfg = _CFG
+    
+    try:
+        msg = _build_message(order, user_email, user_name, cfg)
         
         # Send email
         logger.info(f"📧 Sending order confirmation email to {user_email}")
-        with smtplib.SMTP(smtp_server, smtp_port, timeout=30) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
+        try:
+            with _smtp_pool.get(cfg.server, cfg.port, cfg.sender_email, cfg.sender_password) as server:
+                server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Server dropped the pooled connection mid-send; retry once on a fresh one
+            with _smtp_pool.get(cfg.server, cfg.port, cfg.sender_email, cfg.sender_password) as server:
+                server.send_message(msg)
         
         logger.info(f"✅ Order confirmation email sent successfully to {user_email}")
         return True
@@ -234,12 +389,127 @@ def send_order_confirmation_email(order: dict, user_email: str, user_name: str)
         return False
 
 
+def send_order_confirmation_emails(batch: List[Tuple[dict, str, str]]) -> List[bool]:
+    """
+    Send several order confirmation emails over one SMTP session
+    
+    Args:
+        batch: (order, user_email, user_name) tuples
+    
+    Returns:
+        List[bool]: per-email success, in the same order as batch
+    """
+    if not _EMAIL_ENABLED:
+        logger.warning("Email configuration missing. Skipping email send.")
+        return [False] * len(batch)
+    cfg = _CFG
+    
+    results: List[bool] = []
+    try:
+        with _smtp_pool.get(cfg.server, cfg.port, cfg.sender_email, cfg.sender_password) as server:
+            for order, user_email, user_name in batch:
+                try:
+                    msg = _build_message(order, user_email, user_name, cfg)
+                    logger.info(f"📧 Sending order confirmation email to {user_email}")
+                    server.send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Error sending email to {user_email}: {str(e)}")
+                    results.append(False)
+                    continue
+                logger.info(f"✅ Order confirmation email sent successfully to {user_email}")
+                results.append(True)
+    except smtplib.SMTPServerDisconnected:
+        # Finish the rest one by one; each send retries on a fresh connection
+        for order, user_email, user_name in batch[len(results):]:
+            results.append(send_order_confirmation_email(order, user_email, user_name))
+    except smtplib.SMTPAuthenticationError as e:
+        logger.error(f"❌ SMTP Authentication failed: {str(e)}")
+        logger.error("   Check SENDER_EMAIL and SENDER_PASSWORD in .env.local")
+    except Exception as e:
+        logger.error(f"❌ Error sending emails: {str(e)}")
+    
+    results.extend([False] * (len(batch) - len(results)))
+    return results
+
+
+# Queued sends are drained in bursts so they share one SMTP session
+_BATCH_WINDOW = 0.1
+_email_queue = queue.Queue()
+_email_worker = None
+_email_worker_lock = threading.Lock()
+
+
+def _email_worker_loop():
+    while True:
+        pending = [_email_queue.get()]
+        time.sleep(_BATCH_WINDOW)
+        while True:
+            try:
+                pending.append(_email_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        stop = None in pending
+        jobs = [job for job in pending if job is not None and job[0].set_running_or_notify_cancel()]
+        if jobs:
+            try:
+                results = send_order_confirmation_emails([args for _, args in jobs])
+            except Exception as e:
+                for future, _ in jobs:
+                    future.set_exception(e)
+            else:
+                for (future, _), result in zip(jobs, results):
+                    future.set_result(result)
+        if stop:
+            return
+
+
+def _stop_email_worker():
+    """Flush queued emails before the interpreter exits"""
+    if _email_worker is not None and _email_worker.is_alive():
+        _email_queue.put(None)
+        _email_worker.join(timeout=30)
+
+
+def enqueue_order_confirmation_email(order: dict, user_email: str, user_name: str) -> Future:
+    """
+    Queue an order confirmation email and return immediately
+
+    Returns:
+        Future resolving to the bool result of sending this email
+    """
+    global _email_worker
+    with _email_worker_lock:
+        if _email_worker is None:
+            _email_worker = threading.Thread(target=_email_worker_loop, name="email", daemon=True)
+            _email_worker.start()
+    future: Future = Future()
+    _email_queue.put((future, (order, user_email, user_name)))
+    return future
+
+
+async def send_order_confirmation_email_async(order: dict, user_email: str, user_name: str) -> bool:
+    """
+    Awaitable order confirmation send for async callers (FastAPI, the agent)
+    
+    The SMTP I/O runs on the email worker thread, so the event loop keeps
+    serving other tasks while the message is queued, batched and sent.
+    """
+    return await asyncio.wrap_future(enqueue_order_confirmation_email(order, user_email, user_name))
+
+
+# Registered after the pool so the queue is flushed before the connection closes
+atexit.register(_stop_email_worker)
+
+
 def test_email_configuration() -> bool:
     """Test email configuration"""
-    smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    sender_email = os.getenv("SENDER_EMAIL", "")
-    sender_password = os.getenv("SENDER_PASSWORD", "")
+    smtp_server = _CFG.server
+    smtp_port = _CFG.port
+    sender_email = _CFG.sender_email
+    sender_password = _CFG.sender_password
     
     print("\n" + "="*60)
     print("EMAIL CONFIGURATION TEST")
@@ -276,4 +546,5 @@ if __name__ == "__main__":
     # Test email configuration
     from dotenv import load_dotenv
     load_dotenv(".env.local")
+    reload_config()
     test_email_configuration()
@@ -1,11 +1,16 @@
+import asyncio
 import logging
 import sys
+import time
+from operator import itemgetter, mul
 from pathlib import Path
 from typing import Optional
 
 # Add parent directory to path to import commerce module
 sys.path.append(str(Path(__file__).parent.parent))
 
+import aiohttp
+import orjson
 from dotenv import load_dotenv
 from livekit.agents import (
     Agent,
@@ -46,29 +51,342 @@ from auth import (
     authenticate_user,
     get_user_by_email
 )
-from email_service import send_order_confirmation_email
+from email_service import reload_config, send_order_confirmation_email_async
+
+load_dotenv(".env.local")
+# email_service read its SMTP settings at import, before .env.local was loaded
+reload_config()
 
 logger = logging.getLogger("agent")
 logger.info("E-commerce Voice Agent Starting...")
 
-load_dotenv(".env.local")
+# Spoken/typed size variations -> canonical clothing size
+SIZE_MAP = {
+    'S': 'S', 'SMALL': 'S',
+    'M': 'M', 'MEDIUM': 'M', 'MED': 'M',
+    'L': 'L', 'LARGE': 'L',
+    'XL': 'XL', 'EXTRA LARGE': 'XL', 'XLARGE': 'XL', 'X-LARGE': 'XL',
+    'XXL': 'XXL', 'DOUBLE XL': 'XXL', 'DOUBLE EXTRA LARGE': 'XXL', '2XL': 'XXL', 'XX-LARGE': 'XXL',
+}
+
+# Spoken position words -> index into the last list of products shown
+ORDINAL_MAP = {
+    word: idx
+    for idx, words in enumerate([
+        ('first', '1st'),
+        ('second', '2nd'),
+        ('third', '3rd'),
+        ('fourth', '4th'),
+        ('fifth', '5th'),
+        ('sixth', '6th'),
+        ('seventh', '7th'),
+        ('eighth', '8th'),
+        ('ninth', '9th'),
+        ('tenth', '10th'),
+    ])
+    for word in words
+}
+
+# Plain numbers only count as positions right after one of these words
+# ("item 2", "number two"), so "the black one" or "add one mug" don't
+POSITION_WORDS = {'item', 'number', 'option', 'product', 'no', 'no.', '#'}
+CARDINAL_MAP = {
+    word: idx
+    for idx, words in enumerate([
+        ('one', '1'), ('two', '2'), ('three', '3'), ('four', '4'), ('five', '5'),
+        ('six', '6'), ('seven', '7'), ('eight', '8'), ('nine', '9'), ('ten', '10'),
+    ])
+    for word in words
+}
+
+
+def _ordinal_index(reference: str) -> Optional[int]:
+    """Position meant by "second", "the 2nd one" or "item 2"; None if the reference has none"""
+    words = reference.lower().replace('#', ' # ').split()
+    for word, next_word in zip(words, words[1:] + [None]):
+        if word in ORDINAL_MAP:
+            return ORDINAL_MAP[word]
+        if word in POSITION_WORDS and next_word in CARDINAL_MAP:
+            return CARDINAL_MAP[next_word]
+    return None
+
+
+# Order status -> description, and the fixed reply that lists them
+ORDER_STATUSES = {
+    "PENDING": "Order placed, awaiting confirmation",
+    "CONFIRMED": "Order confirmed, being prepared",
+    "SHIPPED": "Order shipped and on the way",
+    "DELIVERED": "Order delivered",
+    "CANCELLED": "Order cancelled"
+}
+ORDER_STATUSES_RESPONSE = "Available order statuses:\n" + "".join(
+    f"• {status}: {description}\n" for status, description in ORDER_STATUSES.items()
+)
+
+_get_quantity = itemgetter('quantity')
+_get_price = itemgetter('price')
+
+
+def _line_totals(cart):
+    """quantity * price for each cart item, computed with C-level map calls"""
+    return list(map(mul, map(_get_quantity, cart), map(_get_price, cart)))
+
+
+def _saved_cart_rows(cart):
+    """Cart items keyed by 'product_id', the schema carts.json shares with the ACP API"""
+    return [
+        {'product_id': item['id'], **{key: value for key, value in item.items() if key != 'id'}}
+        for item in cart
+    ]
+
+
+def _browse_reply(filters):
+    """Products to remember for ordinal references, and the spoken listing"""
+    products = list_products(filters)
+    
+    if not products:
+        return [], "No products found matching your criteria. Try browsing all categories or adjusting your filters."
+    
+    parts = [f"Found {len(products)} products. Here are the first few:\n"]
+    for i, product in enumerate(products[:5], 1):
+        parts.append(f"{i}. {product['name']} - Rs.{product['price']} ({product.get('description', 'No description')})\n")
+    
+    if len(products) > 5:
+        parts.append(f"And {len(products) - 5} more items available.")
+    
+    return products[:10], "".join(parts)  # Limit to 10 for voice
+
+
+# track_order replies keyed by (order ID, updated_at); any status change
+# bumps updated_at, so a stale summary is never served
+_order_summaries = {}
+_ORDER_SUMMARIES_MAX = 256
+
+
+def _order_summary(order):
+    """Spoken status summary for an order, formatted once per order revision"""
+    key = (order['id'], order['updated_at'])
+    summary = _order_summaries.get(key)
+    if summary is None:
+        items = "".join(
+            f"- {item['name']} x{item['quantity']} = Rs.{item['line_total']}\n"
+            for item in order['line_items']
+        )
+        summary = (
+            f"Order Status: {order['id']}\n"
+            f"Status: {order['status']}\n"
+            f"Total: Rs.{order['total_amount']}\n"
+            f"Items:\n"
+            f"{items}"
+            f"\nOrdered: {order['created_at'][:10]}\n"
+            f"Last updated: {order['updated_at'][:10]}"
+        )
+        if len(_order_summaries) >= _ORDER_SUMMARIES_MAX:
+            _order_summaries.clear()
+        _order_summaries[key] = summary
+    return summary
+
 
 # Session state for shopping cart
 class ShoppingSession:
     def __init__(self):
         self.user = None  # Current authenticated user
-        self.cart = []  # List of {product_id, quantity, name, price}
+        self.cart = []  # List of {id, name, price, quantity, size}, the frontend's schema; size is always set ('' if none)
+        self.cart_index = {}  # (id, size) -> cart item
         self.last_shown_products = []  # For reference like "the second item"
         self.last_order_id = None
+        self.last_sync_ts = 0.0  # Monotonic time the local cart last matched the frontend's
+        self.pending_push = None  # Latest cart push task, finished before the next fetch
     
     def reset(self):
         """Reset session state"""
         self.user = None
-        self.cart = []
+        self.set_cart([])
         self.last_shown_products = []
         self.last_order_id = None
+    
+    def set_cart(self, cart):
+        """Replace the cart and rebuild its (id, size) index"""
+        self.cart = cart
+        self.cart_index = {}
+        for item in cart:
+            self.cart_index.setdefault((item['id'], item['size']), item)
+    
+    def add_cart_item(self, item):
+        self.cart.append(item)
+        self.cart_index.setdefault((item['id'], item['size']), item)
+    
+    def remove_cart_item(self, item):
+        self.cart.remove(item)
+        self.set_cart(self.cart)
+    
+    def set_item_size(self, item, size):
+        item['size'] = size
+        self.set_cart(self.cart)
+    
+    def find_cart_item(self, reference):
+        """First cart item whose name contains reference or whose ID equals it"""
+        reference_lower = reference.lower()
+        for item in self.cart:
+            if reference_lower in item['name'].lower() or reference == item['id']:
+                return item
+        return None
+
+
+# One keep-alive HTTP session for all frontend calls, created on first use
+# (aiohttp sessions must be created inside a running event loop)
+_http_session: Optional[aiohttp.ClientSession] = None
+_http_jobs = 0  # Jobs in this process using _http_session; the last one closes it
+
+
+async def _get_http() -> aiohttp.ClientSession:
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        # Everything goes to the local frontend; keep a few sockets warm
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=30)
+        )
+    return _http_session
+
+
+def _acquire_http() -> None:
+    """Register a job as a user of the shared session"""
+    global _http_jobs
+    _http_jobs += 1
+
+
+async def _release_http():
+    """Shutdown callback: close the shared session once no other job needs it"""
+    global _http_jobs
+    _http_jobs -= 1
+    if _http_jobs == 0 and _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+async def _get_json(url: str, timeout: float) -> Optional[dict]:
+    """GET a frontend endpoint; returns the JSON body on HTTP 200, else None"""
+    http = await _get_http()
+    async with http.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+        if response.status != 200:
+            return None
+        return orjson.loads(await response.read())
+
+
+async def _post_json(url: str, payload: dict, timeout: Optional[float] = None) -> None:
+    """POST JSON to a frontend endpoint"""
+    http = await _get_http()
+    kwargs = {} if timeout is None else {"timeout": aiohttp.ClientTimeout(total=timeout)}
+    async with http.post(url, data=orjson.dumps(payload), headers=_JSON_HEADERS, **kwargs):
+        pass
+
+
+# Strong references so pending background tasks aren't garbage collected
+_background_tasks: set = set()
+
+
+def _on_background_done(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug(f"Frontend sync failed: {task.exception()}")
+
+
+def _fire_and_forget(coro) -> asyncio.Task:
+    """Run a best-effort frontend update without delaying the tool's reply"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_done)
+    return task
+
+
+# Catalog lookups change only when catalog.json does; reuse them for a while
+_CATALOG_TTL_S = 300
+_CATALOG_CACHE_MAX = 64
+_catalog_cache = {}  # key -> (monotonic timestamp, value), oldest first
+
+
+async def _run(fn, *args, **kwargs):
+    """Run a blocking commerce/auth call in a worker thread"""
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+async def _cached_catalog_lookup(key, fn, *args):
+    """Return fn(*args), reusing the result cached under key for _CATALOG_TTL_S"""
+    now = time.monotonic()
+    hit = _catalog_cache.get(key)
+    if hit is not None and now - hit[0] < _CATALOG_TTL_S:
+        return hit[1]
+    value = await _run(fn, *args)
+    # Keys include free-form product references, so keep the dict bounded;
+    # re-inserting moves the key to the end, so the first key is the oldest
+    _catalog_cache.pop(key, None)
+    if len(_catalog_cache) >= _CATALOG_CACHE_MAX:
+        del _catalog_cache[next(iter(_catalog_cache))]
+    _catalog_cache[key] = (now, value)
+    return value
+
+
+# An empty cart synced this recently is trusted by remove/update tools
+_EMPTY_CART_SYNC_AGE_S = 2.0
+
+
+async def _sync_cart_from_frontend(
+    shopping_session: ShoppingSession,
+    max_age_s: float = 1.0,
+    empty_max_age_s: Optional[float] = None,
+) -> None:
+    """Pull the cart from the frontend unless it was fetched within max_age_s
+
+    Tools that only act on existing items pass empty_max_age_s so an empty
+    cart that was synced recently is answered without another round-trip.
+    """
+    if empty_max_age_s is not None and not shopping_session.cart:
+        max_age_s = max(max_age_s, empty_max_age_s)
+    if time.monotonic() - shopping_session.last_sync_ts < max_age_s:
+        return
+    # Let our own last push land first, or the GET could return the cart from before it
+    if shopping_session.pending_push is not None and not shopping_session.pending_push.done():
+        await asyncio.wait([shopping_session.pending_push])
+    try:
+        data = await _get_json('http://localhost:3000/api/cart', timeout=2)
+    except Exception:
+        return  # If sync fails, use backend cart
+    if data and data.get('success') and data.get('cart'):
+        shopping_session.set_cart([{
+            'id': item['id'],
+            'name': item['name'],
+            'price': item['price'],
+            'quantity': item['quantity'],
+            'size': item.get('size', '')
+        } for item in data['cart']])
+    shopping_session.last_sync_ts = time.monotonic()
+
+
+def _invalidate_cart_sync(shopping_session: ShoppingSession) -> None:
+    """Force the next _sync_cart_from_frontend call to hit the frontend"""
+    shopping_session.last_sync_ts = 0.0
+
 
-shopping_session = ShoppingSession()
+async def _post_cart_after(shopping_session: ShoppingSession, previous: Optional[asyncio.Task]) -> None:
+    """POST the session's current cart once the previous push has finished"""
+    # Pooled connections can deliver overlapping POSTs out of order, so pushes
+    # go one at a time, each sending the cart as it is when its turn comes
+    if previous is not None:
+        await asyncio.wait([previous])
+    await _post_json('http://localhost:3000/api/cart',
+        {'action': 'sync', 'cart': shopping_session.cart}, timeout=1)
+
+
+def _push_cart_to_frontend(shopping_session: ShoppingSession) -> None:
+    """Send the cart to the frontend after a local change; items already use its schema"""
+    # The local cart is now the newer copy, so there's nothing to pull yet
+    shopping_session.last_sync_ts = time.monotonic()
+    previous = shopping_session.pending_push
+    if previous is not None and previous.done():
+        previous = None
+    shopping_session.pending_push = _fire_and_forget(_post_cart_after(shopping_session, previous))
 
 
 class ECommerceAgent(Agent):
@@ -111,6 +429,8 @@ Be conversational, helpful, and always confirm important actions.
 Prices are in Indian Rupees (Rs.).
 Do not use complex formatting, emojis, or asterisks in your responses.""",
         )
+        # Per-agent state so concurrent sessions in one worker don't share a cart
+        self.shopping_session = ShoppingSession()
 
     @function_tool
     async def browse_catalog(
@@ -135,22 +455,15 @@ Do not use complex formatting, emojis, or asterisks in your responses.""",
         if max_price and max_price > 0:
             filters['max_price'] = max_price
             
-        products = list_products(filters)
-        
-        if not products:
-            return "No products found matching your criteria. Try browsing all categories or adjusting your filters."
-        
-        # Store for reference ("the second item")
-        shopping_session.last_shown_products = products[:10]  # Limit to 10 for voice
+        shown, reply = await _cached_catalog_lookup(
+            ('browse', tuple(sorted(filters.items()))), _browse_reply, filters
+        )
         
-        result = f"Found {len(products)} products. Here are the first few:\n"
-        for i, product in enumerate(products[:5], 1):
-            result += f"{i}. {product['name']} - Rs.{product['price']} ({product.get('description', 'No description')})\n"
+        if shown:
+            # Store for reference ("the second item")
+            self.shopping_session.last_shown_products = shown
         
-        if len(products) > 5:
-            result += f"And {len(products) - 5} more items available."
-            
-        return result
+        return reply
     
     @function_tool
     async def add_to_cart(self, context: RunContext, product_reference: str, quantity: int = 1, size: str = "") -> str:
@@ -161,46 +474,30 @@ Do not use complex formatting, emojis, or asterisks in your responses.""",
             quantity: Number of items to add
             size: Size for clothing items (S, M, L, XL). Required for t-shirts, hoodies, and clothing.
         """
-        if not shopping_session.user:
+        if not self.shopping_session.user:
             return "Please login or create an account first to add items to cart. Say 'I want to login with email [your-email] and password [your-password]' or 'Create account for [your-name] with email [your-email]'."
         
-        # Sync cart from frontend first
-        try:
-            import requests
-            response = requests.get('http://localhost:3000/api/cart', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('success') and data.get('cart'):
-                    shopping_session.cart = [{
-                        'product_id': item['id'],
-                        'name': item['name'],
-                        'price': item['price'],
-                        'quantity': item['quantity'],
-                        'size': item.get('size', '')
-                    } for item in data['cart']]
-        except:
-            pass
+        await _sync_cart_from_frontend(self.shopping_session)
         
         product = None
         
         # Handle references like "first item", "second item"
-        if "first" in product_reference.lower() or "1" in product_reference:
-            if shopping_session.last_shown_products:
-                product = shopping_session.last_shown_products[0]
-        elif "second" in product_reference.lower() or "2" in product_reference:
-            if len(shopping_session.last_shown_products) > 1:
-                product = shopping_session.last_shown_products[1]
-        elif "third" in product_reference.lower() or "3" in product_reference:
-            if len(shopping_session.last_shown_products) > 2:
-                product = shopping_session.last_shown_products[2]
+        ordinal = _ordinal_index(product_reference)
+        if ordinal is not None:
+            if ordinal < len(self.shopping_session.last_shown_products):
+                product = self.shopping_session.last_shown_products[ordinal]
         else:
             # Search by name or ID
             # First try exact ID match
-            product = get_product_by_id(product_reference)
+            product = await _cached_catalog_lookup(
+                ('product', product_reference), get_product_by_id, product_reference
+            )
             
             # If not found, search by name
             if not product:
-                search_results = search_products(product_reference)
+                search_results = await _cached_catalog_lookup(
+                    ('search', product_reference), search_products, product_reference
+                )
                 if search_results:
                     product = search_results[0]  # Take first match
         
@@ -211,115 +508,61 @@ Do not use complex formatting, emojis, or asterisks in your responses.""",
         if product['category'] == 'clothing' and not size:
             return f"Please specify the size for {product['name']}. Available sizes are S, M, L, XL, XXL. Say 'Add {product['name']} size M to cart' or similar."
         
-        # Add to cart
-        cart_item = {
-            'product_id': product['id'],
-            'name': product['name'],
-            'price': product['price'],
-            'quantity': quantity,
-            'size': size if size else ''
-        }
-        
-        # Normalize size input
+        # Normalize size input; invalid sizes like "EM" become ''
         if size:
-            size = size.strip().upper()
-            # Handle common variations
-            if size in ['MEDIUM', 'MED']:
-                size = 'M'
-            elif size in ['SMALL']:
-                size = 'S'
-            elif size in ['LARGE']:
-                size = 'L'
-            elif size in ['EXTRA LARGE', 'XLARGE', 'X-LARGE']:
-                size = 'XL'
-            elif size in ['DOUBLE XL', 'DOUBLE EXTRA LARGE', '2XL', 'XX-LARGE']:
-                size = 'XXL'
-            # Remove invalid sizes like "EM"
-            if size not in ['S', 'M', 'L', 'XL', 'XXL']:
-                size = ''
+            size = SIZE_MAP.get(size.strip().upper(), '')
         
         # Check if item already in cart (same product and size)
-        found = False
-        for item in shopping_session.cart:
-            if item['product_id'] == product['id'] and item.get('size', '') == size:
-                item['quantity'] += quantity
-                total_price = item['quantity'] * item['price']
-                found = True
-                
-                # Sync with frontend
-                try:
-                    import requests
-                    cart_for_frontend = [{
-                        'id': item['product_id'],
-                        'name': item['name'],
-                        'price': item['price'],
-                        'quantity': item['quantity'],
-                        'size': item.get('size', '')
-                    } for item in shopping_session.cart]
-                    requests.post('http://localhost:3000/api/cart', 
-                        json={'action': 'sync', 'cart': cart_for_frontend}, timeout=1)
-                except:
-                    pass
-                
-                return f"Updated {product['name']} quantity to {item['quantity']}. Item total: Rs.{total_price}"
-        
-        if not found:
-            shopping_session.cart.append(cart_item)
-            item_total = quantity * product['price']
-            
-            # Sync with frontend
-            try:
-                import requests
-                cart_for_frontend = [{
-                    'id': item['product_id'],
-                    'name': item['name'],
-                    'price': item['price'],
-                    'quantity': item['quantity'],
-                    'size': item.get('size', '')
-                } for item in shopping_session.cart]
-                requests.post('http://localhost:3000/api/cart', 
-                    json={'action': 'sync', 'cart': cart_for_frontend}, timeout=1)
-            except:
-                pass
-            
-            size_text = f" (size {size})" if size else ""
-            return f"Added {quantity} {product['name']}{size_text} to cart for Rs.{item_total}. Say 'show cart' to review."
+        item = self.shopping_session.cart_index.get((product['id'], size))
+        if item is not None:
+            message = self._update_existing(item, quantity)
+        else:
+            message = self._append_new(product, quantity, size)
+        
+        _push_cart_to_frontend(self.shopping_session)
+        
+        return message
+    
+    def _update_existing(self, item, quantity):
+        """Add quantity to a cart item and describe the new line"""
+        item['quantity'] += quantity
+        total_price = item['quantity'] * item['price']
+        return f"Updated {item['name']} quantity to {item['quantity']}. Item total: Rs.{total_price}"
+    
+    def _append_new(self, product, quantity, size):
+        """Put a new line in the cart and describe it"""
+        self.shopping_session.add_cart_item({
+            'id': product['id'],
+            'name': product['name'],
+            'price': product['price'],
+            'quantity': quantity,
+            'size': size
+        })
+        item_total = quantity * product['price']
+        size_text = f" (size {size})" if size else ""
+        return f"Added {quantity} {product['name']}{size_text} to cart for Rs.{item_total}. Say 'show cart' to review."
     
     @function_tool
     async def show_cart(self, context: RunContext) -> str:
         """Show current shopping cart contents."""
-        # Sync with frontend cart first
-        try:
-            import requests
-            response = requests.get('http://localhost:3000/api/cart', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('success') and data.get('cart'):
-                    # Update backend cart from frontend
-                    shopping_session.cart = [{
-                        'product_id': item['id'],
-                        'name': item['name'],
-                        'price': item['price'],
-                        'quantity': item['quantity']
-                    } for item in data['cart']]
-        except:
-            pass  # If sync fails, use backend cart
-        
-        if not shopping_session.cart:
-            return "Your cart is empty. Browse products and add items to get started."
+        await _sync_cart_from_frontend(self.shopping_session)
         
-        result = "Your shopping cart:\n"
-        total = 0
+        if not self.shopping_session.cart:
+            return "Your cart is empty. Browse products and add items to get started."
         
-        for i, item in enumerate(shopping_session.cart, 1):
-            item_total = item['quantity'] * item['price']
-            result += f"{i}. {item['name']} x{item['quantity']} = Rs.{item_total}\n"
-            total += item_total
+        cart = self.shopping_session.cart
+        item_totals = _line_totals(cart)
+        total = sum(item_totals)
         
-        result += f"\nTotal: Rs.{total}"
-        result += "\nSay 'place order' to checkout or 'remove item' to modify cart."
+        parts = ["Your shopping cart:\n"]
+        parts.extend(
+            f"{i}. {item['name']} x{item['quantity']} = Rs.{item_total}\n"
+            for i, (item, item_total) in enumerate(zip(cart, item_totals), 1)
+        )
+        parts.append(f"\nTotal: Rs.{total}")
+        parts.append("\nSay 'place order' to checkout or 'remove item' to modify cart.")
         
-        return result
+        return "".join(parts)
     
     @function_tool
     async def remove_from_cart(self, context: RunContext, product_reference: str) -> str:
@@ -328,132 +571,93 @@ Do not use complex formatting, emojis, or asterisks in your responses.""",
         Args:
             product_reference: Product name or reference to remove
         """
-        # Sync cart from frontend first
-        try:
-            import requests
-            response = requests.get('http://localhost:3000/api/cart', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('success') and data.get('cart'):
-                    shopping_session.cart = [{
-                        'product_id': item['id'],
-                        'name': item['name'],
-                        'price': item['price'],
-                        'quantity': item['quantity'],
-                        'size': item.get('size', '')
-                    } for item in data['cart']]
-        except:
-            pass
-        
-        if not shopping_session.cart:
+        await _sync_cart_from_frontend(self.shopping_session, empty_max_age_s=_EMPTY_CART_SYNC_AGE_S)
+        
+        if not self.shopping_session.cart:
             return "Your cart is empty."
         
         # Find item to remove
-        for i, item in enumerate(shopping_session.cart):
-            if (product_reference.lower() in item['name'].lower() or 
-                product_reference == item['product_id']):
-                removed_item = shopping_session.cart.pop(i)
-                
-                # Sync with frontend
-                try:
-                    import requests
-                    cart_for_frontend = [{
-                        'id': item['product_id'],
-                        'name': item['name'],
-                        'price': item['price'],
-                        'quantity': item['quantity'],
-                        'size': item.get('size', '')
-                    } for item in shopping_session.cart]
-                    requests.post('http://localhost:3000/api/cart', 
-                        json={'action': 'sync', 'cart': cart_for_frontend}, timeout=1)
-                except:
-                    pass
-                
-                return f"Removed {removed_item['name']} from cart."
-        
-        return f"Could not find '{product_reference}' in your cart."
+        removed_item = self.shopping_session.find_cart_item(product_reference)
+        if removed_item is None:
+            return f"Could not find '{product_reference}' in your cart."
+        self.shopping_session.remove_cart_item(removed_item)
+        
+        _push_cart_to_frontend(self.shopping_session)
+        
+        return f"Removed {removed_item['name']} from cart."
     
     @function_tool
     async def place_order(self, context: RunContext) -> str:
         """Place the current order."""
-        if not shopping_session.user:
+        if not self.shopping_session.user:
             return "Please login first to place an order."
         
-        # Sync cart from frontend first
-        try:
-            import requests
-            response = requests.get('http://localhost:3000/api/cart', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('success') and data.get('cart'):
-                    shopping_session.cart = [{
-                        'product_id': item['id'],
-                        'name': item['name'],
-                        'price': item['price'],
-                        'quantity': item['quantity'],
-                        'size': item.get('size', '')
-                    } for item in data['cart']]
-        except:
-            pass
-        
-        if not shopping_session.cart:
+        await _sync_cart_from_frontend(self.shopping_session)
+        
+        if not self.shopping_session.cart:
             return "Your cart is empty. Add items before placing an order."
         
         # Convert cart to line items
         line_items = []
-        for item in shopping_session.cart:
+        for item in self.shopping_session.cart:
             line_item = {
-                'product_id': item['product_id'],
+                'product_id': item['id'],
                 'quantity': item['quantity']
             }
             # Include size if present
-            if item.get('size'):
+            if item['size']:
                 line_item['size'] = item['size']
             line_items.append(line_item)
         
         # Prepare buyer info from logged-in user
         buyer_info = {
-            'name': shopping_session.user['name'],
-            'email': shopping_session.user['email'],
-            'phone': shopping_session.user['phone'],
-            'address': shopping_session.user['address']
+            'name': self.shopping_session.user['name'],
+            'email': self.shopping_session.user['email'],
+            'phone': self.shopping_session.user['phone'],
+            'address': self.shopping_session.user['address']
         }
         
         # Create order with error handling
         try:
-            order = create_order(line_items, buyer_info)
-            shopping_session.last_order_id = order['id']
+            order = await _run(create_order, line_items, buyer_info)
+            self.shopping_session.last_order_id = order['id']
+            _order_summary(order)  # Ready for the "where's my order?" that usually follows
             
-            # Send order confirmation email
-            try:
-                email_sent = send_order_confirmation_email(
-                    order=order,
-                    user_email=shopping_session.user['email'],
-                    user_name=shopping_session.user['name']
-                )
-                if email_sent:
-                    logger.info(f"✅ Order confirmation email sent to {shopping_session.user['email']}")
-                else:
-                    logger.warning(f"⚠️ Failed to send order confirmation email")
-            except Exception as email_error:
-                logger.error(f"❌ Error sending email: {str(email_error)}")
+            # Send order confirmation email in the background
+            user_email = self.shopping_session.user['email']
+            
+            def _log_email_result(future):
+                if future.cancelled():
+                    return
+                try:
+                    if future.result():
+                        logger.info(f"✅ Order confirmation email sent to {user_email}")
+                    else:
+                        logger.warning(f"⚠️ Failed to send order confirmation email")
+                except Exception as email_error:
+                    logger.error(f"❌ Error sending email: {str(email_error)}")
+            
+            email_task = asyncio.create_task(send_order_confirmation_email_async(
+                order,
+                user_email,
+                self.shopping_session.user['name']
+            ))
+            _background_tasks.add(email_task)
+            email_task.add_done_callback(_background_tasks.discard)
+            email_task.add_done_callback(_log_email_result)
             
             # Clear cart after successful order
-            shopping_session.cart = []
+            self.shopping_session.set_cart([])
+            _invalidate_cart_sync(self.shopping_session)
             
-            # Notify frontend to clear cart and show success message
+            # Notify frontend to show the order and clear its cart in one request
             try:
-                import requests
-                # Send order details to frontend
-                requests.post('http://localhost:3000/api/order-placed', 
-                    json={'order': {
+                await _post_json('http://localhost:3000/api/order-completed',
+                    {'order': {
                         'id': order['id'],
                         'total_amount': order['total_amount'],
                         'line_items': order['line_items']
-                    }}, timeout=1)
-                # Also clear frontend cart
-                requests.post('http://localhost:3000/api/cart', 
-                    json={'action': 'sync', 'cart': []}, timeout=1)
+                    }, 'clear_cart': True}, timeout=1)
             except Exception as e:
                 logger.warning(f"Could not notify frontend: {e}")
                 pass  # Frontend notification is optional
@@ -461,7 +665,7 @@ Do not use complex formatting, emojis, or asterisks in your responses.""",
             result = f"Order placed successfully!\n"
             result += f"Order ID: {order['id']}\n"
             result += f"Total: Rs.{order['total_amount']}\n"
-            result += f"Delivery to: {shopping_session.user['address']}\n"
+            result += f"Delivery to: {self.shopping_session.user['address']}\n"
             result += f"Status: {order['status']}\n"
             result += "A confirmation email has been sent to your email address.\n"
             result += "Thank you for your purchase!"
@@ -476,49 +680,45 @@ Do not use complex formatting, emojis, or asterisks in your responses.""",
     @function_tool
     async def show_last_order(self, context: RunContext) -> str:
         """Show details of the last placed order."""
-        if not shopping_session.last_order_id:
+        if not self.shopping_session.last_order_id:
             # Try to get most recent order
-            recent_orders = get_recent_orders(1)
+            recent_orders = await _run(get_recent_orders, 1)
             if not recent_orders:
                 return "No orders found."
             order = recent_orders[0]
         else:
-            order = get_order(shopping_session.last_order_id)
+            order = await _run(get_order, self.shopping_session.last_order_id)
         
         if not order:
             return "Could not find your last order."
         
-        result = f"Your last order (ID: {order['id']}):\n"
-        result += f"Status: {order['status']}\n"
-        result += f"Total: Rs.{order['total_amount']}\n"
-        result += "Items:\n"
+        parts = [f"Your last order (ID: {order['id']}):\n"]
+        parts.append(f"Status: {order['status']}\n")
+        parts.append(f"Total: Rs.{order['total_amount']}\n")
+        parts.append("Items:\n")
         
         for item in order['line_items']:
-            result += f"- {item['name']} x{item['quantity']} = Rs.{item['line_total']}\n"
+            parts.append(f"- {item['name']} x{item['quantity']} = Rs.{item['line_total']}\n")
         
-        result += f"Ordered on: {order['created_at'][:10]}"
+        parts.append(f"Ordered on: {order['created_at'][:10]}")
         
-        return result
+        return "".join(parts)
     
     @function_tool
     async def get_categories(self, context: RunContext) -> str:
         """Show available product categories."""
-        categories = get_categories()
+        categories = await _cached_catalog_lookup(('categories',), get_categories)
         return f"Available categories: {', '.join(categories)}. Say 'show me [category]' to browse."
     
     @function_tool
     async def login_user(self, context: RunContext, email: str, password: str) -> str:
         """Login existing user."""
-        user = authenticate_user(email, password)
+        user = await _run(authenticate_user, email, password)
         if user:
-            shopping_session.user = user
+            self.shopping_session.user = user
             # Sync with frontend
-            try:
-                import requests
-                requests.post('http://localhost:3000/api/auth', 
-                    json={'action': 'login', 'name': user['name'], 'email': user['email']})
-            except:
-                pass  # Frontend sync is optional
+            _fire_and_forget(_post_json('http://localhost:3000/api/auth',
+                {'action': 'login', 'name': user['name'], 'email': user['email']}))
             return f"Welcome back, {user['name']}! You can now start shopping."
         else:
             return "Invalid email or password. Please try again or create a new account."
@@ -526,16 +726,12 @@ Do not use complex formatting, emojis, or asterisks in your responses.""",
     @function_tool
     async def create_account(self, context: RunContext, name: str, email: str, password: str, phone: str, address: str) -> str:
         """Create new user account."""
-        user = create_user(email, password, name, phone, address)
+        user = await _run(create_user, email, password, name, phone, address)
         if user:
-            shopping_session.user = user
+            self.shopping_session.user = user
             # Sync with frontend
-            try:
-                import requests
-                requests.post('http://localhost:3000/api/auth', 
-                    json={'action': 'login', 'name': user['name'], 'email': user['email']})
-            except:
-                pass  # Frontend sync is optional
+            _fire_and_forget(_post_json('http://localhost:3000/api/auth',
+                {'action': 'login', 'name': user['name'], 'email': user['email']}))
             return f"Account created successfully! Welcome {name}. You can now start shopping."
         else:
             return "Email already exists. Please login or use a different email."
@@ -548,212 +744,138 @@ Do not use complex formatting, emojis, or asterisks in your responses.""",
             product_reference: Product name or reference
             new_size: New size (S, M, L, XL)
         """
-        # Sync cart from frontend first
-        try:
-            import requests
-            response = requests.get('http://localhost:3000/api/cart', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('success') and data.get('cart'):
-                    shopping_session.cart = [{
-                        'product_id': item['id'],
-                        'name': item['name'],
-                        'price': item['price'],
-                        'quantity': item['quantity'],
-                        'size': item.get('size', '')
-                    } for item in data['cart']]
-        except:
-            pass
-        
-        if not shopping_session.cart:
+        await _sync_cart_from_frontend(self.shopping_session, empty_max_age_s=_EMPTY_CART_SYNC_AGE_S)
+        
+        if not self.shopping_session.cart:
             return "Your cart is empty."
         
         # Normalize size
-        new_size = new_size.strip().upper()
-        if new_size in ['MEDIUM', 'MED']:
-            new_size = 'M'
-        elif new_size in ['SMALL']:
-            new_size = 'S'
-        elif new_size in ['LARGE']:
-            new_size = 'L'
-        elif new_size in ['EXTRA LARGE', 'XLARGE', 'X-LARGE']:
-            new_size = 'XL'
-        elif new_size in ['DOUBLE XL', 'DOUBLE EXTRA LARGE', '2XL', 'XX-LARGE']:
-            new_size = 'XXL'
-        
-        if new_size not in ['S', 'M', 'L', 'XL', 'XXL']:
-            return f"Invalid size '{new_size}'. Valid sizes are S, M, L, XL, XXL."
+        requested_size = new_size.strip().upper()
+        new_size = SIZE_MAP.get(requested_size, '')
+        if not new_size:
+            return f"Invalid size '{requested_size}'. Valid sizes are S, M, L, XL, XXL."
         
         # Find item and update size
-        for item in shopping_session.cart:
-            if (product_reference.lower() in item['name'].lower() or 
-                product_reference == item['product_id']):
-                old_size = item.get('size', 'no size')
-                item['size'] = new_size
-                
-                # Sync with frontend
-                try:
-                    import requests
-                    cart_for_frontend = [{
-                        'id': cart_item['product_id'],
-                        'name': cart_item['name'],
-                        'price': cart_item['price'],
-                        'quantity': cart_item['quantity'],
-                        'size': cart_item.get('size', '')
-                    } for cart_item in shopping_session.cart]
-                    requests.post('http://localhost:3000/api/cart', 
-                        json={'action': 'sync', 'cart': cart_for_frontend}, timeout=1)
-                except:
-                    pass
-                
-                return f"Updated {item['name']} size from {old_size} to {new_size}."
-        
-        return f"Could not find '{product_reference}' in your cart."
+        item = self.shopping_session.find_cart_item(product_reference)
+        if item is None:
+            return f"Could not find '{product_reference}' in your cart."
+        old_size = item['size']
+        self.shopping_session.set_item_size(item, new_size)
+        
+        _push_cart_to_frontend(self.shopping_session)
+        
+        return f"Updated {item['name']} size from {old_size} to {new_size}."
     
     @function_tool
     async def update_cart_quantity(self, context: RunContext, product_reference: str, quantity: int) -> str:
         """Update quantity of item in cart."""
-        # Sync cart from frontend first
-        try:
-            import requests
-            response = requests.get('http://localhost:3000/api/cart', timeout=2)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('success') and data.get('cart'):
-                    shopping_session.cart = [{
-                        'product_id': item['id'],
-                        'name': item['name'],
-                        'price': item['price'],
-                        'quantity': item['quantity'],
-                        'size': item.get('size', '')
-                    } for item in data['cart']]
-        except:
-            pass
-        
-        if not shopping_session.cart:
+        await _sync_cart_from_frontend(self.shopping_session, empty_max_age_s=_EMPTY_CART_SYNC_AGE_S)
+        
+        if not self.shopping_session.cart:
             return "Your cart is empty."
         
-        for item in shopping_session.cart:
-            if (product_reference.lower() in item['name'].lower() or 
-                product_reference == item['product_id']):
-                old_qty = item['quantity']
-                item['quantity'] = quantity
-                
-                if quantity <= 0:
-                    shopping_session.cart.remove(item)
-                    
-                    # Sync with frontend
-                    try:
-                        import requests
-                        cart_for_frontend = [{
-                            'id': item['product_id'],
-                            'name': item['name'],
-                            'price': item['price'],
-                            'quantity': item['quantity'],
-                            'size': item.get('size', '')
-                        } for item in shopping_session.cart]
-                        requests.post('http://localhost:3000/api/cart', 
-                            json={'action': 'sync', 'cart': cart_for_frontend}, timeout=1)
-                    except:
-                        pass
-                    
-                    return f"Removed {item['name']} from cart."
-                else:
-                    # Sync with frontend
-                    try:
-                        import requests
-                        cart_for_frontend = [{
-                            'id': cart_item['product_id'],
-                            'name': cart_item['name'],
-                            'price': cart_item['price'],
-                            'quantity': cart_item['quantity'],
-                            'size': cart_item.get('size', '')
-                        } for cart_item in shopping_session.cart]
-                        requests.post('http://localhost:3000/api/cart', 
-                            json={'action': 'sync', 'cart': cart_for_frontend}, timeout=1)
-                    except:
-                        pass
-                    
-                    return f"Updated {item['name']} quantity from {old_qty} to {quantity}."
-        
-        return f"Could not find '{product_reference}' in your cart."
+        item = self.shopping_session.find_cart_item(product_reference)
+        if item is None:
+            return f"Could not find '{product_reference}' in your cart."
+        old_qty = item['quantity']
+        item['quantity'] = quantity
+        
+        if quantity <= 0:
+            self.shopping_session.remove_cart_item(item)
+            
+            _push_cart_to_frontend(self.shopping_session)
+            
+            return f"Removed {item['name']} from cart."
+        else:
+            _push_cart_to_frontend(self.shopping_session)
+            
+            return f"Updated {item['name']} quantity from {old_qty} to {quantity}."
     
     @function_tool
     async def get_order_history(self, context: RunContext) -> str:
         """Get order history for the logged-in user."""
-        if not shopping_session.user:
+        if not self.shopping_session.user:
             return "Please login first to view your order history."
         
-        email = shopping_session.user['email']
-        orders = get_orders_by_user(email)
+        email = self.shopping_session.user['email']
+        orders = await _run(get_orders_by_user, email)
         
         if not orders:
             return "You have not placed any orders yet."
         
-        result = f"Your order history ({len(orders)} orders):\n\n"
+        parts = [f"Your order history ({len(orders)} orders):\n\n"]
         for i, order in enumerate(orders[:5], 1):  # Show last 5
-            result += f"{i}. Order ID: {order['id']}\n"
-            result += f"   Total: Rs.{order['total_amount']}\n"
-            result += f"   Status: {order['status']}\n"
-            result += f"   Date: {order['created_at'][:10]}\n"
-            result += f"   Items: {len(order['line_items'])}\n\n"
+            parts.append(f"{i}. Order ID: {order['id']}\n")
+            parts.append(f"   Total: Rs.{order['total_amount']}\n")
+            parts.append(f"   Status: {order['status']}\n")
+            parts.append(f"   Date: {order['created_at'][:10]}\n")
+            parts.append(f"   Items: {len(order['line_items'])}\n\n")
         
         if len(orders) > 5:
-            result += f"... and {len(orders) - 5} more orders."
+            parts.append(f"... and {len(orders) - 5} more orders.")
         
-        return result
+        return "".join(parts)
     
     @function_tool
     async def get_spending_info(self, context: RunContext) -> str:
         """Get spending summary for the logged-in user."""
-        if not shopping_session.user:
+        if not self.shopping_session.user:
             return "Please login first to view your spending."
         
-        email = shopping_session.user['email']
-        total_spending = calculate_user_spending(email)
-        category_spending = get_spending_by_category(email)
+        email = self.shopping_session.user['email']
+        # Independent reads of the order history; run them side by side off the loop
+        total_spending, category_spending = await asyncio.gather(
+            _run(calculate_user_spending, email),
+            _run(get_spending_by_category, email),
+        )
         
-        result = f"Your spending summary:\n"
-        result += f"Total spent: Rs.{total_spending}\n\n"
+        parts = [f"Your spending summary:\n"]
+        parts.append(f"Total spent: Rs.{total_spending}\n\n")
         
         if category_spending:
-            result += "Spending by category:\n"
+            parts.append("Spending by category:\n")
             for category, amount in sorted(category_spending.items(), key=lambda x: x[1], reverse=True):
-                result += f"- {category}: Rs.{amount}\n"
+                parts.append(f"- {category}: Rs.{amount}\n")
         else:
-            result += "No purchases yet."
+            parts.append("No purchases yet.")
         
-        return result
+        return "".join(parts)
     
     @function_tool
     async def save_cart_for_later(self, context: RunContext) -> str:
         """Save current cart for later."""
-        if not shopping_session.user:
+        if not self.shopping_session.user:
             return "Please login first to save cart."
         
-        if not shopping_session.cart:
+        if not self.shopping_session.cart:
             return "Your cart is empty."
         
-        email = shopping_session.user['email']
-        save_cart(email, shopping_session.cart)
+        email = self.shopping_session.user['email']
+        await _run(save_cart, email, _saved_cart_rows(self.shopping_session.cart))
         
-        return f"Cart saved successfully with {len(shopping_session.cart)} items. You can continue shopping anytime."
+        return f"Cart saved successfully with {len(self.shopping_session.cart)} items. You can continue shopping anytime."
     
     @function_tool
     async def load_saved_cart(self, context: RunContext) -> str:
         """Load previously saved cart."""
-        if not shopping_session.user:
+        if not self.shopping_session.user:
             return "Please login first to load saved cart."
         
-        email = shopping_session.user['email']
-        saved_cart = get_cart(email)
+        email = self.shopping_session.user['email']
+        saved_cart = await _run(get_cart, email)
         
         if not saved_cart:
             return "You don't have a saved cart."
         
-        shopping_session.cart = saved_cart
+        # Saved rows use the ACP 'product_id' key (see _saved_cart_rows);
+        # older ones used 'id' or could omit 'size'
+        for item in saved_cart:
+            if 'id' not in item:
+                item['id'] = item.pop('product_id')
+            item.setdefault('size', '')
+        self.shopping_session.set_cart(saved_cart)
         
-        total = sum(item['quantity'] * item['price'] for item in saved_cart)
+        total = sum(_line_totals(saved_cart))
         
         return f"Loaded saved cart with {len(saved_cart)} items. Total: Rs.{total}. Say 'show cart' to review."
     
@@ -761,45 +883,27 @@ Do not use complex formatting, emojis, or asterisks in your responses.""",
     async def track_order(self, context: RunContext, order_id: str) -> str:
         """Track a specific order by ID."""
         try:
-            order = get_order(order_id)
+            order = await _run(get_order, order_id)
             if not order:
                 return f"Order {order_id} not found."
             
-            result = f"Order Status: {order['id']}\n"
-            result += f"Status: {order['status']}\n"
-            result += f"Total: Rs.{order['total_amount']}\n"
-            result += f"Items:\n"
-            
-            for item in order['line_items']:
-                result += f"- {item['name']} x{item['quantity']} = Rs.{item['line_total']}\n"
-            
-            result += f"\nOrdered: {order['created_at'][:10]}\n"
-            result += f"Last updated: {order['updated_at'][:10]}"
-            
-            return result
+            return _order_summary(order)
         except Exception as e:
             return f"Error retrieving order: {str(e)}"
     
     @function_tool
     async def list_order_statuses(self, context: RunContext) -> str:
         """Show available order statuses."""
-        statuses = {
-            "PENDING": "Order placed, awaiting confirmation",
-            "CONFIRMED": "Order confirmed, being prepared",
-            "SHIPPED": "Order shipped and on the way",
-            "DELIVERED": "Order delivered",
-            "CANCELLED": "Order cancelled"
-        }
-        
-        result = "Available order statuses:\n"
-        for status, description in statuses.items():
-            result += f"• {status}: {description}\n"
-        
-        return result
+        return ORDER_STATUSES_RESPONSE
 
 
 def prewarm(proc: JobProcess):
     proc.userdata["vad"] = silero.VAD.load()
+    # The turn detector and the STT/LLM/TTS clients stay in entrypoint: the
+    # detector needs the job's inference executor, and the clients open HTTP
+    # sessions on the job's loop, and neither exists yet during prewarm
+    # min_sentence_len=1 lets one-word replies like "Okay." go to TTS straight away
+    proc.userdata["tts_tokenizer"] = tokenize.basic.SentenceTokenizer(min_sentence_len=1)
 
 
 async def entrypoint(ctx: JobContext):
@@ -813,7 +917,15 @@ async def entrypoint(ctx: JobContext):
     session = AgentSession(
         # Speech-to-text (STT) is your agent's ears, turning the user's speech into text that the LLM can understand
         # See all available models at https://docs.livekit.io/agents/models/stt/
-        stt=deepgram.STT(model="nova-3"),
+        # The plugin always streams 16 kHz mono linear16, so only the language
+        # and formatting need pinning (no per-stream language detection)
+        stt=deepgram.STT(
+                model="nova-3",
+                language="en-IN",
+                sample_rate=16000,
+                punctuate=True,
+                smart_format=True,
+            ),
         # A Large Language Model (LLM) is your agent's brain, processing user input and generating a response
         # See all available models at https://docs.livekit.io/agents/models/llm/
         llm=google.LLM(
@@ -824,8 +936,8 @@ async def entrypoint(ctx: JobContext):
         tts=murf.TTS(
                 voice="en-IN-anusha", 
                 style="Conversation",
-                tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-                text_pacing=True
+                tokenizer=ctx.proc.userdata["tts_tokenizer"],
+                text_pacing=False
             ),
         # VAD and turn detection are used to determine when the user is speaking and when the agent should respond
         # See more at https://docs.livekit.io/agents/build/turns
@@ -834,6 +946,9 @@ async def entrypoint(ctx: JobContext):
         # allow the LLM to generate a response while waiting for the end of turn
         # See more at https://docs.livekit.io/agents/build/audio/#preemptive-generation
         preemptive_generation=True,
+        # The turn detector already waits out mid-sentence pauses, so the base
+        # silence before ending a turn can drop from the 0.5s default
+        min_endpointing_delay=0.3,
     )
 
     # Metrics collection, to measure pipeline performance
@@ -850,6 +965,9 @@ async def entrypoint(ctx: JobContext):
         logger.info(f"Usage: {summary}")
 
     ctx.add_shutdown_callback(log_usage)
+    # The frontend session is shared by every job in this process
+    _acquire_http()
+    ctx.add_shutdown_callback(_release_http)
 
     # Start the session, which initializes the voice pipeline and warms up the models
     await session.start(
@@ -10,7 +10,7 @@ from acp_models import (
     Product, Buyer, CartItem, OrderCreateRequest, ProductFilter, OrderStatus
 )
 from acp_commerce import (
-    list_products, get_product_by_id, create_order,
+    list_products, get_product_by_id, create_order, create_order_async,
     get_order, search_products, get_categories
 )
 
@@ -117,6 +117,22 @@ class TestOrderCreation:
         assert order.buyer.name == "Guest Customer"
         assert order.buyer.email == "guest@example.com"
     
+    async def test_create_order_async(self):
+        """Async variant should create and store the same kind of order"""
+        product = list_products()[0]
+        
+        request = OrderCreateRequest(
+            line_items=[
+                CartItem(product_id=product.id, quantity=1)
+            ],
+            buyer_info=None
+        )
+        
+        order = await create_order_async(request)
+        
+        assert get_order(order.id) == order
+        assert order.total_amount == product.price
+    
     def test_create_order_invalid_product(self):
         """Should fail with invalid product ID"""
         buyer = Buyer(
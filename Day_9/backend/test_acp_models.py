@@ -12,22 +12,40 @@ from acp_models import (
     OrderStatus, ProductFilter, OrderCreateRequest
 )
 
+# Happy-path models built once; they are frozen, so tests can share them
+VALID_PRODUCT = Product(
+    id="test-001",
+    name="Test Product",
+    price=100.0,
+    currency="INR",
+    category="test",
+    description="A test product"
+)
+
+VALID_LINE_ITEM = LineItem(
+    product_id="test-001",
+    name="Test Product",
+    quantity=2,
+    unit_amount=100.0,
+    currency="INR",
+    line_total=200.0
+)
+
+VALID_BUYER = Buyer(
+    name="John Doe",
+    email="john@example.com",
+    phone="+91-9876543210",
+    address="123 Main St"
+)
+
 
 class TestProduct:
     """Test Product model validation"""
     
     def test_valid_product(self):
         """Valid product should pass"""
-        product = Product(
-            id="test-001",
-            name="Test Product",
-            price=100.0,
-            currency="INR",
-            category="test",
-            description="A test product"
-        )
-        assert product.id == "test-001"
-        assert product.price == 100.0
+        assert VALID_PRODUCT.id == "test-001"
+        assert VALID_PRODUCT.price == 100.0
     
     def test_negative_price_fails(self):
         """Negative price should fail"""
@@ -56,22 +74,19 @@ class TestProduct:
         with pytest.raises(ValidationError):
             Product(name="Test Product")
 
+    def test_product_is_frozen(self):
+        """Catalog products are shared, so assignment should fail"""
+        with pytest.raises(ValidationError):
+            VALID_PRODUCT.price = 50.0
+
 
 class TestLineItem:
     """Test LineItem model validation"""
     
     def test_valid_line_item(self):
         """Valid line item should pass"""
-        item = LineItem(
-            product_id="test-001",
-            name="Test Product",
-            quantity=2,
-            unit_amount=100.0,
-            currency="INR",
-            line_total=200.0
-        )
-        assert item.quantity == 2
-        assert item.line_total == 200.0
+        assert VALID_LINE_ITEM.quantity == 2
+        assert VALID_LINE_ITEM.line_total == 200.0
     
     def test_line_total_validation(self):
         """Line total must match quantity * unit_amount"""
@@ -115,14 +130,8 @@ class TestBuyer:
     
     def test_valid_buyer(self):
         """Valid buyer should pass"""
-        buyer = Buyer(
-            name="John Doe",
-            email="john@example.com",
-            phone="+91-9876543210",
-            address="123 Main St"
-        )
-        assert buyer.name == "John Doe"
-        assert buyer.email == "john@example.com"
+        assert VALID_BUYER.name == "John Doe"
+        assert VALID_BUYER.email == "john@example.com"
     
     def test_invalid_email_fails(self):
         """Invalid email should fail"""
@@ -147,26 +156,10 @@ class TestOrder:
     
     def test_valid_order(self):
         """Valid order should pass"""
-        buyer = Buyer(
-            name="John Doe",
-            email="john@example.com"
-        )
-        
-        line_items = [
-            LineItem(
-                product_id="test-001",
-                name="Test Product",
-                quantity=2,
-                unit_amount=100.0,
-                currency="INR",
-                line_total=200.0
-            )
-        ]
-        
         order = Order(
             id="ORD_TEST_001",
-            buyer=buyer,
-            line_items=line_items,
+            buyer=VALID_BUYER,
+            line_items=[VALID_LINE_ITEM],
             total_amount=200.0,
             currency="INR",
             status=OrderStatus.PENDING
@@ -178,36 +171,21 @@ class TestOrder:
     
     def test_total_amount_validation(self):
         """Total amount must match sum of line items"""
-        buyer = Buyer(name="John Doe", email="john@example.com")
-        
-        line_items = [
-            LineItem(
-                product_id="test-001",
-                name="Test Product",
-                quantity=2,
-                unit_amount=100.0,
-                currency="INR",
-                line_total=200.0
-            )
-        ]
-        
         with pytest.raises(ValidationError):
             Order(
                 id="ORD_TEST_001",
-                buyer=buyer,
-                line_items=line_items,
+                buyer=VALID_BUYER,
+                line_items=[VALID_LINE_ITEM],
                 total_amount=150.0,  # Wrong total
                 currency="INR"
             )
     
     def test_empty_line_items_fails(self):
         """Empty line items should fail"""
-        buyer = Buyer(name="John Doe", email="john@example.com")
-        
         with pytest.raises(ValidationError):
             Order(
                 id="ORD_TEST_001",
-                buyer=buyer,
+                buyer=VALID_BUYER,
                 line_items=[],  # Empty
                 total_amount=0,
                 currency="INR"
@@ -240,13 +218,11 @@ class TestOrderCreateRequest:
     
     def test_valid_request(self):
         """Valid request should pass"""
-        buyer = Buyer(name="John Doe", email="john@example.com")
-        
         request = OrderCreateRequest(
             line_items=[
                 CartItem(product_id="test-001", quantity=2)
             ],
-            buyer_info=buyer
+            buyer_info=VALID_BUYER
         )
         
         assert len(request.line_items) == 1
@@ -279,6 +255,22 @@ class TestProductFilter:
         with pytest.raises(ValidationError):
             ProductFilter(max_price=-100.0)
 
+    def test_matches(self):
+        """Filter should match on category, price and search term"""
+        product = Product(
+            id="test-001",
+            name="Stoneware Coffee Mug",
+            price=800.0,
+            currency="INR",
+            category="mug",
+            description="A test product"
+        )
+        assert ProductFilter(category="MUG", search="coffee").matches(product)
+        assert not ProductFilter(max_price=500.0).matches(product)
+        assert not ProductFilter(search="tea").matches(product)
+        assert ProductFilter(name_contains="MUG").matches(product)
+        assert not ProductFilter(name_contains="test").matches(product)
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -3,8 +3,13 @@
 Test script for Day 9 E-commerce Agent commerce functions
 """
 
+import functools
+import os
 import sys
 from pathlib import Path
+from typing import List
+
+import pytest
 
 # Add current directory to path
 sys.path.append(str(Path(__file__).parent))
@@ -19,54 +24,87 @@ from commerce import (
     get_product_by_id
 )
 
-def test_catalog_browsing():
+# Set TEST_VERBOSE=0 to silence the walkthrough output (e.g. under CI)
+VERBOSE = os.environ.get("TEST_VERBOSE", "1") != "0"
+
+_out: List[str] = []
+
+
+def _p(line: str = "") -> None:
+    """Queue a line of test output; it is written when the test returns"""
+    if VERBOSE:
+        _out.append(line)
+
+
+@pytest.fixture(scope="session")
+def catalog():
+    """Full product list, fetched once for the whole session"""
+    return list_products()
+
+
+def _buffered(test_fn):
+    """Write a test's queued output with a single stdout write, even if it fails"""
+    @functools.wraps(test_fn)
+    def wrapper(*args, **kwargs):
+        try:
+            return test_fn(*args, **kwargs)
+        finally:
+            if _out:
+                sys.stdout.write("\n".join(_out) + "\n")
+                _out.clear()
+    return wrapper
+
+
+@_buffered
+def test_catalog_browsing(catalog):
     """Test product catalog browsing"""
-    print("=== Testing Catalog Browsing ===")
+    _p("=== Testing Catalog Browsing ===")
     
-    # Get all products
-    all_products = list_products()
-    print(f"Total products: {len(all_products)}")
+    # All products
+    all_products = catalog
+    _p(f"Total products: {len(all_products)}")
     
     # Show first 3 products
-    print("\nFirst 3 products:")
+    _p("\nFirst 3 products:")
     for i, product in enumerate(all_products[:3], 1):
-        print(f"{i}. {product['name']} - Rs.{product['price']} ({product['category']})")
+        _p(f"{i}. {product['name']} - Rs.{product['price']} ({product['category']})")
     
     # Test category filtering
-    print("\n--- Category Filtering ---")
+    _p("\n--- Category Filtering ---")
     mugs = list_products({'category': 'mug'})
-    print(f"Mugs found: {len(mugs)}")
+    _p(f"Mugs found: {len(mugs)}")
     for mug in mugs:
-        print(f"- {mug['name']} - Rs.{mug['price']}")
+        _p(f"- {mug['name']} - Rs.{mug['price']}")
     
     clothing = list_products({'category': 'clothing'})
-    print(f"\nClothing items: {len(clothing)}")
+    _p(f"\nClothing items: {len(clothing)}")
     for item in clothing:
-        print(f"- {item['name']} - Rs.{item['price']} ({item.get('color', 'N/A')})")
+        _p(f"- {item['name']} - Rs.{item['price']} ({item.get('color', 'N/A')})")
     
     # Test price filtering
-    print("\n--- Price Filtering ---")
+    _p("\n--- Price Filtering ---")
     affordable = list_products({'max_price': 1000})
-    print(f"Items under Rs.1000: {len(affordable)}")
+    _p(f"Items under Rs.1000: {len(affordable)}")
     for item in affordable:
-        print(f"- {item['name']} - Rs.{item['price']}")
+        _p(f"- {item['name']} - Rs.{item['price']}")
     
     # Test search
-    print("\n--- Search Testing ---")
+    _p("\n--- Search Testing ---")
     search_results = search_products("coffee")
-    print(f"Search 'coffee': {len(search_results)} results")
+    _p(f"Search 'coffee': {len(search_results)} results")
     for item in search_results:
-        print(f"- {item['name']} - Rs.{item['price']}")
+        _p(f"- {item['name']} - Rs.{item['price']}")
     
     # Test categories
-    print("\n--- Available Categories ---")
+    _p("\n--- Available Categories ---")
     categories = get_categories()
-    print(f"Categories: {', '.join(categories)}")
+    _p(f"Categories: {', '.join(categories)}")
 
 
+@_buffered
 def test_order_creation():
     """Test order creation and management"""
-    print("\n=== Testing Order Creation ===")
+    _p("\n=== Testing Order Creation ===")
     
     # Create a test order
     line_items = [
@@ -75,78 +113,79 @@ def test_order_creation():
         {'product_id': 'book-001', 'quantity': 1}
     ]
     
-    print("Creating order with:")
+    _p("Creating order with:")
     for item in line_items:
         product = get_product_by_id(item['product_id'])
         if product:
-            print(f"- {product['name']} x{item['quantity']} = Rs.{product['price'] * item['quantity']}")
+            _p(f"- {product['name']} x{item['quantity']} = Rs.{product['price'] * item['quantity']}")
     
     order = create_order(line_items)
-    print(f"\nOrder created: {order['id']}")
-    print(f"Total: Rs.{order['total_amount']}")
-    print(f"Status: {order['status']}")
-    print(f"Items in order: {len(order['line_items'])}")
+    _p(f"\nOrder created: {order['id']}")
+    _p(f"Total: Rs.{order['total_amount']}")
+    _p(f"Status: {order['status']}")
+    _p(f"Items in order: {len(order['line_items'])}")
     
     # Test order retrieval
-    print("\n--- Order Retrieval ---")
+    _p("\n--- Order Retrieval ---")
     retrieved_order = get_order(order['id'])
     if retrieved_order:
-        print(f"Retrieved order: {retrieved_order['id']}")
-        print(f"Total: Rs.{retrieved_order['total_amount']}")
-        print("Line items:")
-        for item in retrieved_order['line_items']:
-            print(f"  - {item['name']} x{item['quantity']} = Rs.{item['line_total']}")
+        _p(f"Retrieved order: {retrieved_order['id']}")
+        _p(f"Total: Rs.{retrieved_order['total_amount']}")
+        _p("Line items:")
+        _p("\n".join(
+            f"  - {item['name']} x{item['quantity']} = Rs.{item['line_total']}"
+            for item in retrieved_order['line_items']
+        ))
     
     # Test recent orders
-    print("\n--- Recent Orders ---")
+    _p("\n--- Recent Orders ---")
     recent = get_recent_orders(3)
-    print(f"Recent orders: {len(recent)}")
+    _p(f"Recent orders: {len(recent)}")
     for order in recent:
-        print(f"- {order['id']} (Rs.{order['total_amount']}) - {order['status']}")
+        _p(f"- {order['id']} (Rs.{order['total_amount']}) - {order['status']}")
     
     return order['id']
 
 
+@_buffered
 def test_voice_scenarios():
     """Test scenarios that would happen in voice interactions"""
-    print("\n=== Testing Voice Scenarios ===")
+    _p("\n=== Testing Voice Scenarios ===")
     
     # Scenario 1: "Show me all coffee mugs"
-    print("Scenario 1: 'Show me all coffee mugs'")
+    _p("Scenario 1: 'Show me all coffee mugs'")
     mugs = list_products({'category': 'mug'})
-    print(f"Found {len(mugs)} mugs:")
+    _p(f"Found {len(mugs)} mugs:")
     for i, mug in enumerate(mugs, 1):
-        print(f"{i}. {mug['name']} - Rs.{mug['price']}")
+        _p(f"{i}. {mug['name']} - Rs.{mug['price']}")
     
     # Scenario 2: "Do you have any t-shirts under 1500?"
-    print("\nScenario 2: 'Do you have any t-shirts under Rs.1500?'")
-    affordable_tshirts = list_products({'category': 'clothing', 'max_price': 1500})
-    tshirts = [item for item in affordable_tshirts if 'shirt' in item['name'].lower()]
-    print(f"Found {len(tshirts)} t-shirts under Rs.1500:")
+    _p("\nScenario 2: 'Do you have any t-shirts under Rs.1500?'")
+    tshirts = list_products({'category': 'clothing', 'max_price': 1500, 'name_contains': 'shirt'})
+    _p(f"Found {len(tshirts)} t-shirts under Rs.1500:")
     for shirt in tshirts:
-        print(f"- {shirt['name']} - Rs.{shirt['price']}")
+        _p(f"- {shirt['name']} - Rs.{shirt['price']}")
     
     # Scenario 3: "I'm looking for a black hoodie"
-    print("\nScenario 3: 'I'm looking for a black hoodie'")
-    black_hoodies = list_products({'category': 'clothing', 'color': 'black'})
-    hoodies = [item for item in black_hoodies if 'hoodie' in item['name'].lower()]
-    print(f"Found {len(hoodies)} black hoodies:")
+    _p("\nScenario 3: 'I'm looking for a black hoodie'")
+    hoodies = list_products({'category': 'clothing', 'color': 'black', 'name_contains': 'hoodie'})
+    _p(f"Found {len(hoodies)} black hoodies:")
     for hoodie in hoodies:
-        print(f"- {hoodie['name']} - Rs.{hoodie['price']}")
+        _p(f"- {hoodie['name']} - Rs.{hoodie['price']}")
     
     # Scenario 4: Order the second hoodie
-    print("\nScenario 4: 'I'll buy the second hoodie you mentioned, in size M'")
+    _p("\nScenario 4: 'I'll buy the second hoodie you mentioned, in size M'")
     if len(hoodies) > 1:
         selected_hoodie = hoodies[1]  # Second hoodie (index 1)
-        print(f"Selected: {selected_hoodie['name']} - Rs.{selected_hoodie['price']}")
+        _p(f"Selected: {selected_hoodie['name']} - Rs.{selected_hoodie['price']}")
         
         # Create order
         order = create_order([{'product_id': selected_hoodie['id'], 'quantity': 1}])
-        print(f"Order placed: {order['id']} for Rs.{order['total_amount']}")
+        _p(f"Order placed: {order['id']} for Rs.{order['total_amount']}")
         
         return order['id']
     else:
-        print("Not enough hoodies to select second one")
+        _p("Not enough hoodies to select second one")
         return None
 
 
@@ -157,7 +196,7 @@ def main():
     
     try:
         # Test catalog browsing
-        test_catalog_browsing()
+        test_catalog_browsing(list_products())
         
         # Test order creation
         order_id = test_order_creation()
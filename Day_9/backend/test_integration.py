@@ -1,10 +1,32 @@
 """
 E-Commerce Agent - Integration Testing Suite
 Tests all backend endpoints and frontend components
+
+Run as a script for the step-by-step report, or under pytest, in
+parallel with pytest-xdist:
+
+    pytest -n auto --dist=load test_integration.py
+
+--dist=load spreads the tests across workers (loadfile would keep this
+whole file on one). Fixtures are per worker, so each worker creates its
+own created_order order.
+
+The pytest tests are skipped when the API isn't running at BASE_URL.
+Set TEST_LOCAL=1 (or pass --local) to answer every request with canned
+JSON instead, so the suite runs without a backend.
 """
 
+import argparse
+import os
+import statistics
+import time
+import pytest
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
 from typing import Dict, List, Any
 from datetime import datetime
 
@@ -18,131 +40,289 @@ TEST_USER = {
     "address": "123 Test Street, Test City"
 }
 
+# Request cases shared by the script runner and the pytest functions
+CATALOG_TESTS = [
+    {
+        "name": "GET /acp/catalog",
+        "method": "GET",
+        "url": f"{BASE_URL}/acp/catalog",
+        "expected_keys": ["success", "count", "products"]
+    },
+    {
+        "name": "GET /acp/categories",
+        "method": "GET",
+        "url": f"{BASE_URL}/acp/categories",
+        "expected_keys": ["success", "categories"]
+    },
+    {
+        "name": "GET /acp/catalog?category=mug",
+        "method": "GET",
+        "url": f"{BASE_URL}/acp/catalog?category=mug",
+        "expected_keys": ["success", "products"]
+    },
+    {
+        "name": "GET /acp/products/search?q=coffee",
+        "method": "GET",
+        "url": f"{BASE_URL}/acp/products/search?q=coffee",
+        "expected_keys": ["success", "products"]
+    }
+]
+
+ORDER_PAYLOAD = {
+    "line_items": [
+        {
+            "product_id": "mug-001",
+            "name": "Coffee Mug",
+            "quantity": 2,
+            "unit_amount": 800,
+            "currency": "INR"
+        }
+    ],
+    "buyer_info": TEST_USER
+}
+
+# CartItem rows, as saved by POST /acp/users/{email}/cart and read back by GET
+CART_ITEMS = [
+    {
+        "product_id": "tshirt-001",
+        "quantity": 1
+    }
+]
+
+def parse_json(response):
+    """Decode a response body once with orjson; None if it isn't JSON"""
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        return None
+
+
+def is_ok(status, data, expected_keys=()):
+    """200 with a JSON object holding every expected key"""
+    return status == 200 and isinstance(data, dict) and data.keys() >= set(expected_keys)
+
+
+def ok_payload(response, expected_keys=()):
+    """The decoded body if the response passes is_ok, else None; decodes only on a 200"""
+    if response.status_code != 200:
+        return None
+    data = parse_json(response)
+    return data if is_ok(200, data, expected_keys) else None
+
+
+def batch_payload(tests):
+    """POST /acp/batch body running each test's GET"""
+    return {"requests": [{"method": "GET", "path": test["url"][len(BASE_URL):]} for test in tests]}
+
+
+# ==================== LOCAL MODE ====================
+
+LOCAL_ORDER_ID = "ORD-LOCAL-0001"
+
+
+class _FakeResponse:
+    """Just enough of requests.Response for the suite's checks"""
+    
+    def __init__(self, status, payload):
+        self.status_code = status
+        self.content = orjson.dumps(payload)
+    
+    def json(self):
+        return orjson.loads(self.content)
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+
+def local_responses():
+    """Canned {(method, url): _FakeResponse} for every endpoint the suite hits"""
+    order = {"id": LOCAL_ORDER_ID, "status": "PENDING", **ORDER_PAYLOAD}
+    cart_url = f"{BASE_URL}/acp/users/{TEST_EMAIL}/cart"
+    payloads = {
+        ("HEAD", f"{BASE_URL}/health"): {},
+        ("GET", f"{BASE_URL}/health"): {"status": "healthy"},
+        ("GET", f"{BASE_URL}/acp/catalog"): {"success": True, "count": 0, "products": []},
+        ("GET", f"{BASE_URL}/acp/categories"): {"success": True, "categories": []},
+        ("GET", f"{BASE_URL}/acp/catalog?category=mug"): {"success": True, "count": 0, "products": []},
+        ("GET", f"{BASE_URL}/acp/products/search?q=coffee"): {"success": True, "count": 0, "products": []},
+        ("POST", f"{BASE_URL}/acp/orders"): {"success": True, "message": "Order created successfully", "order": order},
+        ("GET", f"{BASE_URL}/acp/orders/{LOCAL_ORDER_ID}"): {"success": True, "order": order},
+        ("GET", f"{BASE_URL}/acp/users/{TEST_EMAIL}/orders"): {"success": True, "email": TEST_EMAIL, "count": 1, "orders": [order]},
+        ("GET", f"{BASE_URL}/acp/users/{TEST_EMAIL}/spending"): {"success": True, "email": TEST_EMAIL, "total_spending": 1600, "by_category": {}},
+        ("POST", f"{BASE_URL}/acp/orders/{LOCAL_ORDER_ID}/status"): {"success": True, "message": "Order status updated", "order": {**order, "status": "SHIPPED"}},
+        ("POST", cart_url): {"success": True, "message": "Cart saved successfully", "email": TEST_EMAIL, "item_count": 1},
+        ("GET", cart_url): {"success": True, "email": TEST_EMAIL, "cart": CART_ITEMS, "item_count": 1},
+        ("DELETE", cart_url): {"success": True, "message": "Cart cleared"},
+    }
+    payloads[("POST", f"{BASE_URL}/acp/batch")] = {
+        "success": True,
+        "responses": [{"status": 200, "body": payloads[("GET", test["url"])]} for test in CATALOG_TESTS]
+    }
+    return {key: _FakeResponse(200, payload) for key, payload in payloads.items()}
+
+
+def use_local_responses(session):
+    """Answer the session's requests from local_responses() instead of the network"""
+    responses = local_responses()
+    not_found = _FakeResponse(404, {"detail": "Not Found"})
+    # Session.get/post/head/delete all go through request()
+    session.request = lambda method, url, **kwargs: responses.get((method.upper(), url), not_found)
+
+
 class Colors:
     GREEN = '\033[92m'
     RED = '\033[91m'
     YELLOW = '\033[93m'
     BLUE = '\033[94m'
     END = '\033[0m'
+    # Pre-built report fragments
+    PASS_STR = f"{GREEN}✓ PASS{END}"
+    FAIL_STR = f"{RED}✗ FAIL{END}"
+    BAR = f"{BLUE}{'='*50}{END}"
 
 class EcommerceTestSuite:
-    def __init__(self):
-        self.passed = 0
-        self.failed = 0
+    def __init__(self, batch=True, local=False):
+        # Send the catalog checks as one POST /acp/batch instead of separate GETs
+        self.batch = batch
+        self.local = local or bool(os.getenv("TEST_LOCAL"))
+        # (group, name, passed, elapsed_ms) per result; totals are derived from it
         self.tests = []
+        self.group = ""
+        # One keep-alive session for the whole suite instead of a new
+        # connection per request
+        self.session = requests.Session()
+        # Retries are handled explicitly where wanted (see test_health_check)
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=Retry(total=0))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if self.local:
+            use_local_responses(self.session)
         
     def print_header(self, text):
-        print(f"\n{Colors.BLUE}{'='*50}{Colors.END}")
+        self.group = text
+        print(f"\n{Colors.BAR}")
         print(f"{Colors.BLUE}{text}{Colors.END}")
-        print(f"{Colors.BLUE}{'='*50}{Colors.END}\n")
+        print(f"{Colors.BAR}\n")
     
     def print_test(self, name, passed, message=""):
-        status = f"{Colors.GREEN}✓ PASS{Colors.END}" if passed else f"{Colors.RED}✗ FAIL{Colors.END}"
+        status = Colors.PASS_STR if passed else Colors.FAIL_STR
         print(f"{status} | {name}")
         if message:
             print(f"       {Colors.YELLOW}{message}{Colors.END}")
     
+    def record(self, name, passed, message="", elapsed_ms=0.0):
+        """Report one result and add it to the tally"""
+        self.print_test(name, passed, message)
+        self.tests.append((self.group, name, passed, elapsed_ms))
+    
+    @property
+    def passed(self):
+        return sum(passed for _, _, passed, _ in self.tests)
+    
+    @property
+    def failed(self):
+        return len(self.tests) - self.passed
+    
+    def timed_request(self, method, url, json=None):
+        """(response or the exception raised, elapsed ms)"""
+        t0 = time.perf_counter()
+        try:
+            response = self.session.request(method, url, json=json, timeout=5)
+        except Exception as e:
+            response = e
+        return response, (time.perf_counter() - t0) * 1000
+    
+    def check(self, name, outcome, expected_keys=()):
+        """Record a timed_request outcome; returns (passed, decoded body or None)"""
+        response, elapsed_ms = outcome
+        if isinstance(response, Exception):
+            self.record(name, False, str(response), elapsed_ms)
+            return False, None
+        data = ok_payload(response, expected_keys)
+        passed = data is not None
+        self.record(name, passed, f"Status: {response.status_code}", elapsed_ms)
+        return passed, data
+    
+    def _run_http_test(self, name, method, url, json=None, expected_keys=()):
+        """Send one timed request and record it; returns (passed, decoded body or None)"""
+        return self.check(name, self.timed_request(method, url, json), expected_keys)
+    
+    def run_concurrently(self, tests):
+        """Send independent requests at once, then record them in order"""
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            outcomes = [executor.submit(self.timed_request, test["method"], test["url"]) for test in tests]
+            for test, outcome in zip(tests, outcomes):
+                self.check(test["name"], outcome.result(), test["expected_keys"])
+    
+    def fetch_batch(self, tests):
+        """Send every test's GET in one /acp/batch call; returns (test, status, data) triples in order"""
+        response = self.session.post(f"{BASE_URL}/acp/batch", json=batch_payload(tests), timeout=5)
+        response.raise_for_status()
+        return [
+            (test, result["status"], result["body"])
+            for test, result in zip(tests, parse_json(response)["responses"])
+        ]
+    
     def test_health_check(self):
         """Test API health endpoint"""
         self.print_header("1. HEALTH CHECK")
         
-        try:
-            response = requests.get(f"{BASE_URL}/health", timeout=5)
-            passed = response.status_code == 200
-            self.print_test("Health Check", passed, f"Status: {response.status_code}")
-            self.passed += 1 if passed else 0
-            self.failed += 1 if not passed else 0
-            return passed
-        except Exception as e:
-            self.print_test("Health Check", False, str(e))
-            self.failed += 1
+        # A bodiless HEAD, retried with a short backoff in case the server is still starting
+        t0 = time.perf_counter()
+        error = None
+        # Three attempts; no sleep after the last one
+        for delay in (0.1, 0.2, None):
+            try:
+                response = self.session.head(f"{BASE_URL}/health", timeout=1)
+                error = None
+                if response.status_code == 200:
+                    break
+            except requests.RequestException as e:
+                error = e
+            if delay is not None:
+                time.sleep(delay)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        
+        if error is not None:
+            self.record("Health Check", False, str(error), elapsed_ms)
             return False
+        
+        passed = response.status_code == 200
+        self.record("Health Check", passed, f"Status: {response.status_code}", elapsed_ms)
+        return passed
     
     def test_catalog_endpoints(self):
         """Test all catalog endpoints"""
         self.print_header("2. CATALOG ENDPOINTS")
         
-        tests = [
-            {
-                "name": "GET /acp/catalog",
-                "method": "GET",
-                "url": f"{BASE_URL}/acp/catalog",
-                "expected_keys": ["success", "count", "products"]
-            },
-            {
-                "name": "GET /acp/categories",
-                "method": "GET",
-                "url": f"{BASE_URL}/acp/categories",
-                "expected_keys": ["success", "categories"]
-            },
-            {
-                "name": "GET /acp/catalog?category=mug",
-                "method": "GET",
-                "url": f"{BASE_URL}/acp/catalog?category=mug",
-                "expected_keys": ["success", "products"]
-            },
-            {
-                "name": "GET /acp/products/search?q=coffee",
-                "method": "GET",
-                "url": f"{BASE_URL}/acp/products/search?q=coffee",
-                "expected_keys": ["success", "products"]
-            }
-        ]
+        if not self.batch:
+            self.run_concurrently(CATALOG_TESTS)
+            return
         
-        for test in tests:
-            try:
-                response = requests.get(test["url"], timeout=5)
-                passed = response.status_code == 200
-                
-                if passed:
-                    data = response.json()
-                    passed = all(key in data for key in test["expected_keys"])
-                
-                self.print_test(test["name"], passed, f"Status: {response.status_code}")
-                self.passed += 1 if passed else 0
-                self.failed += 1 if not passed else 0
-            except Exception as e:
-                self.print_test(test["name"], False, str(e))
-                self.failed += 1
+        t0 = time.perf_counter()
+        try:
+            results = self.fetch_batch(CATALOG_TESTS)
+        except Exception as e:
+            for test in CATALOG_TESTS:
+                self.record(test["name"], False, f"Batch request failed: {e}")
+            return
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        
+        for test, status, data in results:
+            passed = is_ok(status, data, test["expected_keys"])
+            self.record(test["name"], passed, f"Status: {status} (batched)", elapsed_ms)
     
     def test_order_creation(self):
         """Test order creation endpoint"""
         self.print_header("3. ORDER CREATION")
         
-        order_payload = {
-            "line_items": [
-                {
-                    "product_id": "mug-001",
-                    "name": "Coffee Mug",
-                    "quantity": 2,
-                    "unit_amount": 800,
-                    "currency": "INR"
-                }
-            ],
-            "buyer_info": TEST_USER
-        }
-        
-        try:
-            response = requests.post(
-                f"{BASE_URL}/acp/orders",
-                json=order_payload,
-                timeout=5
-            )
-            passed = response.status_code == 200
-            
-            if passed:
-                data = response.json()
-                passed = "order" in data and "id" in data["order"]
-                self.order_id = data["order"]["id"] if passed else None
-            
-            self.print_test("POST /acp/orders", passed, f"Status: {response.status_code}")
-            self.passed += 1 if passed else 0
-            self.failed += 1 if not passed else 0
-            return passed
-        except Exception as e:
-            self.print_test("POST /acp/orders", False, str(e))
-            self.failed += 1
-            return False
+        passed, data = self._run_http_test(
+            "POST /acp/orders", "POST", f"{BASE_URL}/acp/orders",
+            json=ORDER_PAYLOAD, expected_keys=["order"]
+        )
+        self.order_id = data["order"].get("id") if passed else None
+        return passed
     
     def test_order_retrieval(self):
         """Test order retrieval endpoints"""
@@ -152,120 +332,41 @@ class EcommerceTestSuite:
             print(f"{Colors.YELLOW}⚠ Skipping order retrieval tests (no order created){Colors.END}")
             return
         
-        tests = [
+        self.run_concurrently([
             {
                 "name": f"GET /acp/orders/{self.order_id}",
+                "method": "GET",
                 "url": f"{BASE_URL}/acp/orders/{self.order_id}",
                 "expected_keys": ["success", "order"]
             },
             {
                 "name": f"GET /acp/users/{TEST_EMAIL}/orders",
+                "method": "GET",
                 "url": f"{BASE_URL}/acp/users/{TEST_EMAIL}/orders",
                 "expected_keys": ["success", "orders"]
             }
-        ]
-        
-        for test in tests:
-            try:
-                response = requests.get(test["url"], timeout=5)
-                passed = response.status_code == 200
-                
-                if passed:
-                    data = response.json()
-                    passed = all(key in data for key in test["expected_keys"])
-                
-                self.print_test(test["name"], passed, f"Status: {response.status_code}")
-                self.passed += 1 if passed else 0
-                self.failed += 1 if not passed else 0
-            except Exception as e:
-                self.print_test(test["name"], False, str(e))
-                self.failed += 1
+        ])
     
     def test_spending_endpoints(self):
         """Test spending analytics endpoints"""
         self.print_header("5. SPENDING ANALYTICS")
         
-        tests = [
-            {
-                "name": f"GET /acp/users/{TEST_EMAIL}/spending",
-                "url": f"{BASE_URL}/acp/users/{TEST_EMAIL}/spending",
-                "expected_keys": ["success", "total_spent"]
-            }
-        ]
-        
-        for test in tests:
-            try:
-                response = requests.get(test["url"], timeout=5)
-                passed = response.status_code == 200
-                
-                if passed:
-                    data = response.json()
-                    passed = all(key in data for key in test["expected_keys"])
-                
-                self.print_test(test["name"], passed, f"Status: {response.status_code}")
-                self.passed += 1 if passed else 0
-                self.failed += 1 if not passed else 0
-            except Exception as e:
-                self.print_test(test["name"], False, str(e))
-                self.failed += 1
+        self._run_http_test(
+            f"GET /acp/users/{TEST_EMAIL}/spending", "GET",
+            f"{BASE_URL}/acp/users/{TEST_EMAIL}/spending",
+            expected_keys=["success", "total_spending"]
+        )
     
     def test_cart_endpoints(self):
         """Test cart persistence endpoints"""
         self.print_header("6. CART PERSISTENCE")
         
-        cart_items = [
-            {
-                "product_id": "tshirt-001",
-                "name": "Cotton T-Shirt",
-                "quantity": 1,
-                "unit_amount": 1200,
-                "currency": "INR",
-                "line_total": 1200
-            }
-        ]
-        
-        # Test save cart
-        try:
-            response = requests.post(
-                f"{BASE_URL}/acp/users/{TEST_EMAIL}/cart",
-                json={"items": cart_items},
-                timeout=5
-            )
-            passed = response.status_code == 200
-            self.print_test(f"POST /acp/users/{TEST_EMAIL}/cart", passed, f"Status: {response.status_code}")
-            self.passed += 1 if passed else 0
-            self.failed += 1 if not passed else 0
-        except Exception as e:
-            self.print_test(f"POST /acp/users/{TEST_EMAIL}/cart", False, str(e))
-            self.failed += 1
-        
-        # Test get cart
-        try:
-            response = requests.get(
-                f"{BASE_URL}/acp/users/{TEST_EMAIL}/cart",
-                timeout=5
-            )
-            passed = response.status_code == 200
-            self.print_test(f"GET /acp/users/{TEST_EMAIL}/cart", passed, f"Status: {response.status_code}")
-            self.passed += 1 if passed else 0
-            self.failed += 1 if not passed else 0
-        except Exception as e:
-            self.print_test(f"GET /acp/users/{TEST_EMAIL}/cart", False, str(e))
-            self.failed += 1
-        
-        # Test delete cart
-        try:
-            response = requests.delete(
-                f"{BASE_URL}/acp/users/{TEST_EMAIL}/cart",
-                timeout=5
-            )
-            passed = response.status_code == 200
-            self.print_test(f"DELETE /acp/users/{TEST_EMAIL}/cart", passed, f"Status: {response.status_code}")
-            self.passed += 1 if passed else 0
-            self.failed += 1 if not passed else 0
-        except Exception as e:
-            self.print_test(f"DELETE /acp/users/{TEST_EMAIL}/cart", False, str(e))
-            self.failed += 1
+        url = f"{BASE_URL}/acp/users/{TEST_EMAIL}/cart"
+        # Kept in order: GET reads what POST saved and DELETE clears it, so
+        # overlapping them would race; they share the session's keep-alive connection
+        self._run_http_test(f"POST /acp/users/{TEST_EMAIL}/cart", "POST", url, json={"cart": CART_ITEMS})
+        self._run_http_test(f"GET /acp/users/{TEST_EMAIL}/cart", "GET", url)
+        self._run_http_test(f"DELETE /acp/users/{TEST_EMAIL}/cart", "DELETE", url)
     
     def test_order_status_update(self):
         """Test order status update"""
@@ -275,44 +376,53 @@ class EcommerceTestSuite:
             print(f"{Colors.YELLOW}⚠ Skipping status update tests (no order created){Colors.END}")
             return
         
-        try:
-            response = requests.post(
-                f"{BASE_URL}/acp/orders/{self.order_id}/status",
-                json={"status": "processing"},
-                timeout=5
-            )
-            passed = response.status_code == 200
-            self.print_test(f"POST /acp/orders/{self.order_id}/status", passed, f"Status: {response.status_code}")
-            self.passed += 1 if passed else 0
-            self.failed += 1 if not passed else 0
-        except Exception as e:
-            self.print_test(f"POST /acp/orders/{self.order_id}/status", False, str(e))
-            self.failed += 1
+        self._run_http_test(
+            f"POST /acp/orders/{self.order_id}/status", "POST",
+            f"{BASE_URL}/acp/orders/{self.order_id}/status",
+            json={"status": "SHIPPED"}
+        )
     
     def print_summary(self):
         """Print test summary"""
         self.print_header("TEST SUMMARY")
         
-        total = self.passed + self.failed
-        percentage = (self.passed / total * 100) if total > 0 else 0
+        passed = self.passed
+        failed = self.failed
+        total = passed + failed
+        percentage = (passed / total * 100) if total > 0 else 0
         
-        print(f"{Colors.GREEN}✓ Passed: {self.passed}{Colors.END}")
-        print(f"{Colors.RED}✗ Failed: {self.failed}{Colors.END}")
+        # Per group: [passed, total, elapsed times]
+        groups = {}
+        for group, _, ok, elapsed_ms in self.tests:
+            stats = groups.setdefault(group, [0, 0, []])
+            stats[0] += ok
+            stats[1] += 1
+            stats[2].append(elapsed_ms)
+        for group, (group_passed, group_total, times) in groups.items():
+            print(f"{group:<24} {group_passed}/{group_total} passed  {statistics.mean(times):7.1f} ms avg")
+        
+        times = [elapsed_ms for *_, elapsed_ms in self.tests]
+        print(f"{'━'*50}")
+        print(f"{Colors.GREEN}✓ Passed: {passed}{Colors.END}")
+        print(f"{Colors.RED}✗ Failed: {failed}{Colors.END}")
         print(f"{'━'*50}")
         print(f"Total: {total} tests")
         print(f"Success Rate: {percentage:.1f}%")
+        if times:
+            p95 = statistics.quantiles(times, n=20)[-1] if len(times) > 1 else times[0]
+            print(f"Latency: {statistics.mean(times):.1f} ms avg, {p95:.1f} ms p95, {max(times):.1f} ms max")
         
-        if self.failed == 0:
+        if failed == 0:
             print(f"\n{Colors.GREEN}🎉 ALL TESTS PASSED!{Colors.END}")
         else:
             print(f"\n{Colors.YELLOW}⚠ Some tests failed. Check errors above.{Colors.END}")
     
     def run_all(self):
         """Run all tests"""
-        print(f"{Colors.BLUE}{'='*50}{Colors.END}")
+        print(Colors.BAR)
         print(f"{Colors.BLUE}E-Commerce Agent - Integration Test Suite{Colors.END}")
-        print(f"{Colors.BLUE}{'='*50}{Colors.END}")
-        print(f"\nBase URL: {BASE_URL}")
+        print(Colors.BAR)
+        print(f"\nBase URL: {BASE_URL}{' (local, canned responses)' if self.local else ''}")
         print(f"Test Email: {TEST_EMAIL}")
         print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         
@@ -326,10 +436,119 @@ class EcommerceTestSuite:
             self.test_order_status_update()
         else:
             print(f"\n{Colors.RED}❌ API is not responding. Cannot continue tests.{Colors.END}")
-            print(f"Please ensure backend is running: python -m uvicorn api:app --host 0.0.0.0 --port 8000")
+            print(f"Please ensure backend is running: python -m uvicorn acp_api:app --host 0.0.0.0 --port 8000")
         
         self.print_summary()
+        self.session.close()
+
+# ==================== PYTEST TESTS ====================
+
+def local_mode(config):
+    """Whether --local or TEST_LOCAL asked for canned responses"""
+    return config.getoption("--local", default=False) or bool(os.getenv("TEST_LOCAL"))
+
+
+@pytest.fixture(scope="session")
+def session(pytestconfig):
+    """Pooled session shared by this worker's tests; skips them if the API is down"""
+    http = requests.Session()
+    http.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=Retry(total=0)))
+    if local_mode(pytestconfig):
+        use_local_responses(http)
+        yield http
+        return
+    try:
+        http.head(f"{BASE_URL}/health", timeout=2)
+    except requests.RequestException:
+        http.close()
+        pytest.skip(f"API not reachable at {BASE_URL}")
+    yield http
+    http.close()
+
+
+@pytest.fixture(scope="session")
+def created_order(session):
+    """ID of an order created once for the tests that need one"""
+    response = session.post(f"{BASE_URL}/acp/orders", json=ORDER_PAYLOAD, timeout=5)
+    return assert_ok(response, ["order"])["order"]["id"]
+
+
+def assert_ok(response, expected_keys=()):
+    """Assert the response passes is_ok and return its decoded body"""
+    data = ok_payload(response, expected_keys)
+    assert data is not None
+    return data
+
+
+def test_health_check(session):
+    assert_ok(session.get(f"{BASE_URL}/health", timeout=5))
+
+
+def test_catalog_batch(session, request):
+    if request.config.getoption("--no-batch", default=False):
+        pytest.skip("batching disabled with --no-batch")
+    response = session.post(f"{BASE_URL}/acp/batch", json=batch_payload(CATALOG_TESTS), timeout=5)
+    data = assert_ok(response, ["responses"])
+    for case, result in zip(CATALOG_TESTS, data["responses"]):
+        assert is_ok(result["status"], result["body"], case["expected_keys"]), case["name"]
+
+
+def test_batch_decodes_path(session, request):
+    if local_mode(request.config):
+        pytest.skip("canned /acp/batch replies only cover the catalog checks")
+    path = f"/acp/users/{quote(TEST_EMAIL)}/cart"
+    response = session.post(f"{BASE_URL}/acp/batch", json={"requests": [{"method": "GET", "path": path}]}, timeout=5)
+    result = assert_ok(response, ["responses"])["responses"][0]
+    # Same as a direct GET: the route sees the decoded email
+    assert is_ok(result["status"], result["body"], ["email"])
+    assert result["body"]["email"] == TEST_EMAIL
+
+
+@pytest.mark.parametrize("case", CATALOG_TESTS, ids=[case["name"] for case in CATALOG_TESTS])
+def test_catalog_endpoint(session, request, case):
+    if not request.config.getoption("--no-batch", default=False):
+        pytest.skip("covered by test_catalog_batch; pass --no-batch to run per endpoint")
+    assert_ok(session.get(case["url"], timeout=5), case["expected_keys"])
+
+
+def test_order_creation(created_order):
+    assert created_order
+
+
+def test_get_order(session, created_order):
+    assert_ok(session.get(f"{BASE_URL}/acp/orders/{created_order}", timeout=5), ["success", "order"])
+
+
+def test_user_orders(session, created_order):
+    assert_ok(session.get(f"{BASE_URL}/acp/users/{TEST_EMAIL}/orders", timeout=5), ["success", "orders"])
+
+
+def test_user_spending(session):
+    assert_ok(session.get(f"{BASE_URL}/acp/users/{TEST_EMAIL}/spending", timeout=5), ["success", "total_spending"])
+
+
+def test_cart_roundtrip(session):
+    url = f"{BASE_URL}/acp/users/{TEST_EMAIL}/cart"
+    assert_ok(session.post(url, json={"cart": CART_ITEMS}, timeout=5))
+    assert assert_ok(session.get(url, timeout=5), ["cart"])["cart"] == CART_ITEMS
+    assert_ok(session.delete(url, timeout=5))
+
+
+def test_order_status_update(session, created_order):
+    response = session.post(
+        f"{BASE_URL}/acp/orders/{created_order}/status",
+        json={"status": "SHIPPED"},
+        timeout=5
+    )
+    assert assert_ok(response, ["order"])["order"]["status"] == "SHIPPED"
+
 
 if __name__ == "__main__":
-    suite = EcommerceTestSuite()
+    parser = argparse.ArgumentParser(description="E-commerce API integration tests")
+    parser.add_argument("--no-batch", action="store_true",
+                        help="hit each catalog endpoint separately instead of via /acp/batch")
+    parser.add_argument("--local", action="store_true",
+                        help="answer requests with canned JSON instead of a live backend (same as TEST_LOCAL=1)")
+    args = parser.parse_args()
+    suite = EcommerceTestSuite(batch=not args.no_batch, local=args.local)
     suite.run_all()
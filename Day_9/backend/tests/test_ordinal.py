@@ -0,0 +1,21 @@
+import pytest
+
+from agent import _ordinal_index
+
+
+@pytest.mark.parametrize(
+    ("reference", "expected"),
+    [
+        ("second", 1),
+        ("the 2nd one", 1),
+        ("item 2", 1),
+        ("number three", 2),
+        ("first hoodie", 0),
+        ("the black one", None),
+        ("add one mug", None),
+        ("mug-001", None),
+    ],
+)
+def test_ordinal_index(reference: str, expected) -> None:
+    """Only ordinal phrases pick from the last products shown."""
+    assert _ordinal_index(reference) == expected
@@ -0,0 +1,36 @@
+import pytest
+
+from agent import _saved_cart_rows
+
+import acp_commerce
+import commerce
+
+EMAIL = "saved-cart-test@example.com"
+
+
+@pytest.fixture
+def carts_file():
+    """Restore carts.json (shared by commerce and acp_commerce) after the test"""
+    path = acp_commerce.CARTS_PATH
+    original = path.read_bytes() if path.exists() else None
+    yield path
+    if original is None:
+        path.unlink(missing_ok=True)
+    else:
+        path.write_bytes(original)
+
+
+def test_agent_saved_cart_reads_back_through_acp(carts_file) -> None:
+    """A cart the agent saves is returned by the ACP cart endpoint's reader."""
+    cart = [
+        {"id": "tshirt-001", "name": "Cotton T-Shirt", "price": 1200, "quantity": 1, "size": "M"},
+        {"id": "mug-001", "name": "Coffee Mug", "price": 800, "quantity": 2, "size": ""},
+    ]
+    commerce.save_cart(EMAIL, _saved_cart_rows(cart))
+
+    saved = acp_commerce.get_cart(EMAIL)
+
+    assert [(item.product_id, item.quantity) for item in saved] == [
+        ("tshirt-001", 1),
+        ("mug-001", 2),
+    ]
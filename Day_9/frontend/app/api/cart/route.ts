@@ -1,9 +1,8 @@
 import { NextRequest, NextResponse } from 'next/server';
-
-let currentCart: any[] = [];
+import { shopState } from '@/lib/shopState';
 
 export async function GET() {
-  return NextResponse.json({ success: true, cart: currentCart });
+  return NextResponse.json({ success: true, cart: shopState.cart });
 }
 
 export async function POST(request: NextRequest) {
@@ -11,19 +10,19 @@ export async function POST(request: NextRequest) {
     const { action, ...data } = await request.json();
     
     if (action === 'sync') {
-      currentCart = data.cart || [];
+      shopState.cart = data.cart || [];
       return NextResponse.json({ success: true });
     }
     
     if (action === 'add') {
       const { product } = data;
-      const existing = currentCart.find(item => item.id === product.id);
+      const existing = shopState.cart.find(item => item.id === product.id);
       if (existing) {
         existing.quantity += 1;
       } else {
-        currentCart.push({ ...product, quantity: 1 });
+        shopState.cart.push({ ...product, quantity: 1 });
       }
-      return NextResponse.json({ success: true, cart: currentCart });
+      return NextResponse.json({ success: true, cart: shopState.cart });
     }
     
     return NextResponse.json({ success: false });
@@ -0,0 +1,29 @@
+import { NextResponse } from 'next/server';
+import { shopState } from '@/lib/shopState';
+
+// Records a placed order and clears the cart in one request from the agent
+export async function POST(request: Request) {
+  try {
+    const { order, clear_cart } = await request.json();
+
+    // Store order for polling via GET /api/order-placed
+    shopState.lastOrder = order;
+    if (clear_cart) {
+      shopState.cart = [];
+    }
+
+    return NextResponse.json({
+      success: true,
+      message: 'Order completion received',
+      order,
+    });
+  } catch (error) {
+    return NextResponse.json(
+      {
+        success: false,
+        error: 'Failed to process order completion',
+      },
+      { status: 500 }
+    );
+  }
+}
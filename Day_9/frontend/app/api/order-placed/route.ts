@@ -1,7 +1,5 @@
 import { NextResponse } from 'next/server';
-
-// Store last order for polling
-let lastOrder: any = null;
+import { shopState } from '@/lib/shopState';
 
 export async function POST(request: Request) {
   try {
@@ -9,7 +7,7 @@ export async function POST(request: Request) {
     const { order } = body;
     
     // Store order for GET requests
-    lastOrder = order;
+    shopState.lastOrder = order;
     
     return NextResponse.json({ 
       success: true,
@@ -25,8 +23,8 @@ export async function POST(request: Request) {
 }
 
 export async function GET() {
-  const order = lastOrder;
-  lastOrder = null; // Clear after reading
+  const order = shopState.lastOrder;
+  shopState.lastOrder = null; // Clear after reading
   return NextResponse.json({ 
     success: true,
     order
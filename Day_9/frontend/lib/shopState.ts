@@ -0,0 +1,6 @@
+// In-memory state shared by the cart and order API routes.
+// Route files may only export handlers, so the state lives here.
+export const shopState: { cart: any[]; lastOrder: any } = {
+  cart: [],
+  lastOrder: null,
+};